@@ -0,0 +1,61 @@
+import tuning
+from engine import (
+    extract_confidence_percent,
+    factor_scores,
+    final_decision,
+    sync_confidence,
+)
+from hdp_engine import hdp_confidence, hdp_suggestion
+from odds import value_edges
+from tracing import span
+
+
+def analyze_prediction(fixture: dict, pred: dict, cfg: dict = None) -> dict:
+    """
+    Satu fixture + prediksi → hasil engine lengkap.
+    Murni (tanpa cache / state global), aman dijalankan di process pool.
+    cfg: config tuning (default: yang aktif), dipakai konsisten di semua engine.
+    """
+    cfg = cfg or tuning.current()
+    fid = fixture["fixture_id"]
+    with span("engine.final_decision", fixture_id=fid):
+        decision = final_decision(pred, cfg)
+    with span("engine.hdp_suggestion", fixture_id=fid):
+        hdp = hdp_suggestion(pred, cfg)
+    with span("engine.hdp_confidence", fixture_id=fid):
+        hdp_info = hdp_confidence(
+            hdp_resp=hdp,
+            home_xg=hdp.get("home_xg", 0),
+            away_xg=hdp.get("away_xg", 0),
+        )
+
+    winner_conf = extract_confidence_percent(decision["confidence"])
+
+    value = None
+    if pred.get("odds"):
+        teams = pred.get("teams", {})
+        pick_side = next(
+            (
+                side for side in ("home", "away")
+                if teams.get(side, {}).get("name") == decision["pick"]
+            ),
+            None,
+        )
+        value = value_edges(pred["odds"], hdp, pick_side, winner_conf)
+
+    best_edge = value["best_hdp"]["edge"] if value and value["best_hdp"] else None
+    with span("engine.sync_confidence", fixture_id=fid):
+        sync = sync_confidence(winner_conf, hdp_info["score"], best_edge, cfg)
+
+    return {
+        "fixture": fixture,
+        "home_scores": factor_scores(pred, "home", cfg),
+        "away_scores": factor_scores(pred, "away", cfg),
+        "decision": decision,
+        "hdp": hdp,
+        "hdp_info": hdp_info,
+        "winner_conf": winner_conf,
+        "sync": sync,
+        "stale": bool(pred.get("stale")),
+        "value": value,
+    }
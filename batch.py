@@ -0,0 +1,170 @@
+"""
+Analisa slate satu tanggal tanpa Telegram (cron job / dashboard).
+
+    python batch.py                                # hari ini, JSONL ke stdout
+    python batch.py --date 2026-10-19 --format csv --out slate.csv
+    python batch.py --cache-only                   # tanpa request api-sports
+
+Konfigurasi sama dengan bot (API_KEY, CACHE_DIR, ...), tanpa BOT_TOKEN.
+--cache-only cukup CACHE_DIR: tanpa API_KEY & tanpa python-telegram-bot.
+Fixture & prediksi diambil lewat cache yang sama dengan bot; engine
+dijalankan di process pool dan hasil ditulis baris per baris begitu siap.
+"""
+import os
+import sys
+import csv
+import json
+import argparse
+import logging
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import cache_io
+import cache_paths
+import tuning
+from analysis import analyze_prediction
+from engine import EXTRACTORS
+
+logger = logging.getLogger("BATCH")
+
+LOAD_CONCURRENCY = 4   # sama dengan PREDICTION_CONCURRENCY bot
+
+CSV_FIELDS = (
+    "fixture_id",
+    "kickoff",
+    "league",
+    "home",
+    "away",
+    "pick",
+    "winner_conf",
+    "home_score",
+    "away_score",
+    "best_side",
+    "best_hdp",
+    "hdp_home",
+    "hdp_away",
+    "hdp_conf",
+    "cover_prob",
+    "home_xg",
+    "away_xg",
+    "sync_tag",
+    "sync_decision",
+    "value_edge",
+    "stale",
+)
+
+
+def analyze_row(item):
+    """
+    Jalan di process worker: (fixture, pred, cfg) → (baris ringkas, analisa)
+    """
+    fixture, pred, cfg = item
+    a = analyze_prediction(fixture, pred, cfg)
+    value = a["value"] or {}
+    best = value.get("best_hdp") or {}
+
+    row = {
+        "fixture_id": fixture["fixture_id"],
+        "kickoff": fixture["kickoff"],
+        "league": fixture["league_name"],
+        "home": fixture["home"],
+        "away": fixture["away"],
+        "pick": a["decision"]["pick"],
+        "winner_conf": a["winner_conf"],
+        "home_score": a["decision"]["home_score"],
+        "away_score": a["decision"]["away_score"],
+        "best_side": a["hdp_info"]["best_side"],
+        "best_hdp": a["hdp"].get("best_hdp"),
+        "hdp_home": a["hdp"].get("hdp_home"),
+        "hdp_away": a["hdp"].get("hdp_away"),
+        "hdp_conf": a["hdp_info"]["score"],
+        "cover_prob": a["hdp_info"]["cover_prob"],
+        "home_xg": a["hdp"].get("home_xg"),
+        "away_xg": a["hdp"].get("away_xg"),
+        "sync_tag": a["sync"]["tag"],
+        "sync_decision": a["sync"]["decision"],
+        "value_edge": best.get("edge"),
+        "stale": a["stale"],
+    }
+    return row, a
+
+
+def load_slate(day: str, cache_only: bool):
+    """
+    → list (fixture, pred) untuk fixture yang punya prediksi
+    """
+    if cache_only:
+        entry = cache_io.read_json(cache_paths.fixture_cache_path(day))
+        fixtures = entry["fixtures"] if isinstance(entry, dict) else []
+
+        def load(f):
+            # cache-only: prediksi kadaluarsa tetap dipakai
+            path = cache_paths.prediction_cache_path(f["fixture_id"])
+            return cache_paths.read_prediction_cache(path)[2]
+    else:
+        # modul bot di-import di sini (bukan top-level) supaya process
+        # worker & mode --cache-only tidak memuat Telegram / butuh API_KEY
+        import main as bot
+
+        fixtures = bot.load_fixture_day(day)["fixtures"]
+        # tidak ada refresh background di sini: prediksi kadaluarsa di-fetch
+        # ulang langsung, bukan disajikan stale
+        load = partial(bot.load_prediction, revalidate=True)
+
+    def safe_load(f):
+        try:
+            return load(f)
+        except Exception as e:
+            logger.warning(f"Prediksi {f['fixture_id']} gagal: {e!r}")
+            return None
+
+    with ThreadPoolExecutor(LOAD_CONCURRENCY) as pool:
+        preds = list(pool.map(safe_load, fixtures))
+
+    slate = [(f, p) for f, p in zip(fixtures, preds) if p]
+    logger.info(f"{day}: {len(fixtures)} fixture, {len(slate)} dengan prediksi")
+    return slate
+
+
+def write_results(results, fmt: str, out):
+    if fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for row, _ in results:
+            writer.writerow(row)
+            out.flush()
+        return
+
+    for row, analysis in results:
+        out.write(json.dumps(dict(row, analysis=analysis), ensure_ascii=False, default=str))
+        out.write("\n")
+        out.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analisa slate tanpa Telegram")
+    parser.add_argument("--date", help="YYYY-MM-DD (default: hari ini WITA)")
+    parser.add_argument("--format", choices=("jsonl", "csv"), default="jsonl")
+    parser.add_argument("--out", help="file output (default: stdout)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--cache-only", action="store_true",
+                        help="hanya baca cache, tanpa request api-sports")
+    args = parser.parse_args(argv)
+
+    day = args.date or cache_paths.today_str()
+    # config tuning dikirim ke tiap worker, sama dengan yang dipakai bot
+    cfg = tuning.load_file(cache_paths.TUNING_FILE, EXTRACTORS)
+    slate = [(f, p, cfg) for f, p in load_slate(day, args.cache_only)]
+
+    out = open(args.out, "w", newline="", encoding="utf-8") if args.out else sys.stdout
+    try:
+        with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+            results = pool.map(analyze_row, slate, chunksize=8)
+            write_results(results, args.format, out)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
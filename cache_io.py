@@ -0,0 +1,79 @@
+import os
+import json
+import asyncio
+import tempfile
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+
+# =========================================================
+# CACHE FILE I/O
+# =========================================================
+# Semua akses disk cache lewat modul ini. Versi sync dipakai dari thread
+# worker (fetch prediksi / refresh fixture), versi async dari handler
+# supaya event loop tidak pernah menunggu disk.
+CACHE_IO_WORKERS = int(os.getenv("CACHE_IO_WORKERS", "4"))
+
+_POOL = ThreadPoolExecutor(
+    max_workers=CACHE_IO_WORKERS,
+    thread_name_prefix="cache-io",
+)
+
+
+def write_atomic(path: str, data: bytes):
+    """
+    Tulis ke file temp di folder yang sama lalu rename,
+    pembaca tidak pernah melihat file setengah jadi
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp_")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def read_bytes(path: str):
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def read_json(path: str, default=None):
+    data = read_bytes(path)
+    if data is None:
+        return default
+    return json.loads(data)
+
+
+def write_json(path: str, obj, **kwargs):
+    write_atomic(path, json.dumps(obj, **kwargs).encode())
+
+
+def remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+# ================= ASYNC =================
+async def run(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_POOL, partial(fn, *args, **kwargs))
+
+
+async def aread_json(path: str, default=None):
+    return await run(read_json, path, default)
+
+
+async def awrite_json(path: str, obj, **kwargs):
+    # serialize di thread pemanggil: obj bisa saja diubah handler lain
+    data = json.dumps(obj, **kwargs).encode()
+    await run(write_atomic, path, data)
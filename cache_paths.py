@@ -0,0 +1,59 @@
+import os
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import cache_io
+import prediction_store
+
+# =========================================================
+# CACHE LAYOUT
+# =========================================================
+# Lokasi & format file cache bot. Tanpa Telegram / API_KEY, jadi bisa
+# dipakai langsung oleh batch.py --cache-only.
+TIMEZONE = "Asia/Makassar"
+WITA = ZoneInfo(TIMEZONE)
+
+CACHE_DIR = os.getenv("CACHE_DIR", "/app/cache")
+TUNING_FILE = os.getenv("TUNING_FILE", os.path.join(CACHE_DIR, "tuning.json"))
+
+
+def today_str():
+    return datetime.now(WITA).strftime("%Y-%m-%d")
+
+
+def fixture_cache_path(day: str):
+    return os.path.join(CACHE_DIR, f"fixtures_{day}.json")
+
+
+def prediction_cache_path(fid: int):
+    return os.path.join(CACHE_DIR, f"prediction_{fid}.bin")
+
+
+def odds_cache_path(day: str):
+    return os.path.join(CACHE_DIR, f"odds_{day}.json")
+
+
+def broadcast_progress_path(day: str):
+    return os.path.join(CACHE_DIR, f"broadcast_{day}.json")
+
+
+def broadcast_cursor_path(day: str):
+    return os.path.join(CACHE_DIR, f"broadcast_{day}.cursor")
+
+
+def read_prediction_cache(path):
+    """
+    → (expires_at, stale_until, pred).
+    (None, None, None) untuk file yang tidak ada / format lama / schema beda
+    """
+    if not path.endswith(".bin"):
+        return None, None, None
+
+    blob = cache_io.read_bytes(path)
+    if blob is None:
+        return None, None, None
+    try:
+        expires_at, stale_until, record = prediction_store.loads(blob)
+    except ValueError:
+        return None, None, None
+    return expires_at, stale_until, prediction_store.expand(record)
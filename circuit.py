@@ -0,0 +1,62 @@
+import time
+import threading
+
+
+class CircuitOpenError(RuntimeError):
+    """Request ditolak karena circuit breaker sedang terbuka"""
+
+
+class CircuitBreaker:
+    """
+    closed    : request jalan normal, gagal beruntun dihitung
+    open      : request langsung ditolak selama reset_timeout detik
+    half_open : satu request percobaan; sukses → closed, gagal → open lagi
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = "half_open"
+                self._trial = False
+
+            # half_open: hanya satu request percobaan
+            if self._trial:
+                return False
+            self._trial = True
+            return True
+
+    def is_open(self) -> bool:
+        with self._lock:
+            return (
+                self.state == "open"
+                and time.monotonic() - self.opened_at < self.reset_timeout
+            )
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self._trial = False
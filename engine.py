@@ -1,3 +1,6 @@
+import tuning
+
+
 # ================= HELPERS =================
 def pct(val) -> float:
     if val is None:
@@ -73,86 +76,112 @@ def build_insight_note(home_scores: dict, away_scores: dict,
 
     return " & ".join(reasons[:2])
 
-# ================= FACTOR SCORES =================
-def factor_scores(pred_resp: dict, side: str) -> dict:
-    team = pred_resp["teams"][side]
-    pred = pred_resp["predictions"]
-    comp = pred_resp.get("comparison", {})
-
-    goals_for = float(team["last_5"]["goals"]["for"].get("average", 0))
-    goals_against = float(team["last_5"]["goals"]["against"].get("average", 0))
-    
-    att = pct(team["last_5"].get("att"))
-    def_ = pct(team["last_5"].get("def"))
-    
+# ================= FACTOR EXTRACTORS =================
+# Bahan pipeline faktor; pipeline (nama, extractor, bobot, params) ada di
+# tuning.py / file tuning.
+def _factor_context(pred_resp: dict, side: str) -> dict:
     opp = "away" if side == "home" else "home"
-    opp_team = pred_resp["teams"][opp]
-    
-    opp_att = pct(opp_team["last_5"].get("att"))
-    opp_def = pct(opp_team["last_5"].get("def"))
-    
     return {
-        # === CORE ===
-        "percent": clamp(pct(pred["percent"].get(side))),
-        "last5_form": clamp(pct(team["last_5"].get("form"))),
-        
-        "attack": clamp(relative_score(att, opp_def)),
-        "defense": clamp(relative_score(def_, opp_att)),
-
-        # === GOALS ===
-        "goals_for": clamp(goals_for * 20),          # 2.5 gol ≈ 50
-        "goals_against": clamp(100 - goals_against * 20),
-
-        # === SUPPORT ===
-        "league_form": league_form_score(
-            team.get("league", {}).get("form", "")
-        ),
-        "h2h": clamp(pct(comp.get("h2h", {}).get(side))),
+        "side": side,
+        "team": pred_resp["teams"][side],
+        "opp_team": pred_resp["teams"][opp],
+        "pred": pred_resp["predictions"],
+        "comp": pred_resp.get("comparison", {}),
     }
 
 
-# ================= WEIGHT CONFIG =================
-WEIGHTS = {
-    "percent": 0.09,
-    "last5_form": 0.14,
-    "attack": 0.12,
-    "defense": 0.12,
-    "goals_for": 0.12,
-    "goals_against": 0.12,
-    "league_form": 0.07,
-    "h2h": 0.05,
+def _x_percent(ctx):
+    return clamp(pct(ctx["pred"]["percent"].get(ctx["side"])))
+
+
+def _x_last5_form(ctx):
+    return clamp(pct(ctx["team"]["last_5"].get("form")))
+
+
+def _x_relative_attack(ctx):
+    att = pct(ctx["team"]["last_5"].get("att"))
+    opp_def = pct(ctx["opp_team"]["last_5"].get("def"))
+    return clamp(relative_score(att, opp_def))
+
+
+def _x_relative_defense(ctx):
+    def_ = pct(ctx["team"]["last_5"].get("def"))
+    opp_att = pct(ctx["opp_team"]["last_5"].get("att"))
+    return clamp(relative_score(def_, opp_att))
+
+
+def _x_goals_for(ctx, scale=20):
+    goals_for = float(ctx["team"]["last_5"]["goals"]["for"].get("average", 0))
+    return clamp(goals_for * scale)
+
+
+def _x_goals_against(ctx, scale=20):
+    goals_against = float(ctx["team"]["last_5"]["goals"]["against"].get("average", 0))
+    return clamp(100 - goals_against * scale)
+
+
+def _x_league_form(ctx):
+    return league_form_score(ctx["team"].get("league", {}).get("form", ""))
+
+
+def _x_h2h(ctx):
+    return clamp(pct(ctx["comp"].get("h2h", {}).get(ctx["side"])))
+
+
+EXTRACTORS = {
+    "percent": _x_percent,
+    "last5_form": _x_last5_form,
+    "relative_attack": _x_relative_attack,
+    "relative_defense": _x_relative_defense,
+    "goals_for": _x_goals_for,
+    "goals_against": _x_goals_against,
+    "league_form": _x_league_form,
+    "h2h": _x_h2h,
 }
 
 
+# ================= FACTOR SCORES =================
+def factor_scores(pred_resp: dict, side: str, cfg: dict = None) -> dict:
+    cfg = cfg or tuning.current()
+    ctx = _factor_context(pred_resp, side)
+    return {
+        f["name"]: EXTRACTORS[f["extractor"]](ctx, **f.get("params", {}))
+        for f in cfg["factors"]
+    }
+
+
 # ================= FINAL SCORE =================
-def final_score(pred_resp: dict, side: str) -> float:
-    scores = factor_scores(pred_resp, side)
-    total = 0.0
+def final_score(pred_resp: dict, side: str, cfg: dict = None, scores: dict = None) -> float:
+    cfg = cfg or tuning.current()
+    if scores is None:
+        scores = factor_scores(pred_resp, side, cfg)
 
-    for k, v in scores.items():
-        total += v * WEIGHTS.get(k, 0)
+    total = 0.0
+    for f in cfg["factors"]:
+        total += scores[f["name"]] * f["weight"]
 
     # 🔧 home bias normalization
     if side == "home":
-        total -= 1.8   # tuning: 1.5–2.2
+        total -= cfg["home_bias"]
 
     return round(total, 2)
 
 # ================= FINAL DECISION =================
-def final_decision(pred_resp: dict) -> dict:
+def final_decision(pred_resp: dict, cfg: dict = None) -> dict:
+    cfg = cfg or tuning.current()
     home_name = pred_resp["teams"]["home"]["name"]
     away_name = pred_resp["teams"]["away"]["name"]
 
+    # === AMBIL DETAIL FACTOR ===
+    home_scores = factor_scores(pred_resp, "home", cfg)
+    away_scores = factor_scores(pred_resp, "away", cfg)
+
     # === HITUNG SCORE ===
-    home_score = final_score(pred_resp, "home")
-    away_score = final_score(pred_resp, "away")
+    home_score = final_score(pred_resp, "home", cfg, home_scores)
+    away_score = final_score(pred_resp, "away", cfg, away_scores)
 
     diff = round(abs(home_score - away_score), 2)
 
-    # === AMBIL DETAIL FACTOR ===
-    home_scores = factor_scores(pred_resp, "home")
-    away_scores = factor_scores(pred_resp, "away")
-
     # === PICK LOGIC ===
     if diff < 5:
         pick = "DRAW / DOUBLE CHANCE"
@@ -190,11 +219,21 @@ def final_decision(pred_resp: dict) -> dict:
         "note": note,
     }
 
-def sync_confidence(winner_conf: int, hdp_conf: int) -> dict:
+def sync_confidence(
+    winner_conf: int,
+    hdp_conf: int,
+    value_edge: float = None,
+    cfg: dict = None,
+) -> dict:
     """
     Sinkronisasi Winner Confidence & HDP Confidence
     Tujuan: menentukan PASAR yang paling layak dimainkan
+
+    value_edge: selisih peluang model vs harga bandar (odds.value_edges)
+    pada sisi HDP terbaik; None bila odds tidak tersedia
     """
+    edge_min = (cfg or tuning.current())["value_edge_min"]
+
     if winner_conf >= 80 and hdp_conf >= 75:
         return {
             "tag": "🔥 IDEAL HDP",
@@ -209,7 +248,14 @@ def sync_confidence(winner_conf: int, hdp_conf: int) -> dict:
             "note": "Tim unggul, namun margin kemenangan beresiko untuk HDP"
         }
 
-    if winner_conf < 70 and hdp_conf >= 75:
+    if value_edge is not None and value_edge >= edge_min and hdp_conf >= 60:
+        return {
+            "tag": "💎 VALUE HDP",
+            "decision": "HDP VALUE",
+            "note": f"Harga bandar lebih tinggi dari peluang model (+{value_edge * 100:.1f}%)"
+        }
+
+    if winner_conf < 70 and hdp_conf >= 75 and (value_edge is None or value_edge >= 0):
         return {
             "tag": "💎 VALUE HDP",
             "decision": "HDP UNDERDOG",
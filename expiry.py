@@ -0,0 +1,72 @@
+import time
+import heapq
+import asyncio
+import threading
+
+
+class ExpiryHeap:
+    """
+    Min-heap (expires_at, key) untuk entry cache.
+    schedule() O(log n) dan aman dipanggil dari thread worker; entry yang
+    dijadwalkan ulang tidak dicari di heap, versi lamanya diabaikan saat pop.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._due = {}          # key -> expires_at terbaru
+        self._lock = threading.Lock()
+        self._loop = None
+        self._wake = None
+
+    def __len__(self):
+        return len(self._due)
+
+    def schedule(self, key, expires_at: float):
+        with self._lock:
+            self._due[key] = expires_at
+            heapq.heappush(self._heap, (expires_at, key))
+            is_head = self._heap[0] == (expires_at, key)
+
+        # entry baru paling awal → bangunkan runner supaya tidur ulang
+        if is_head and self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._wake.set)
+            except RuntimeError:   # loop sudah ditutup
+                pass
+
+    def cancel(self, key):
+        with self._lock:
+            self._due.pop(key, None)
+
+    def pop_due(self, now: float) -> list:
+        out = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                ts, key = heapq.heappop(self._heap)
+                if self._due.get(key) == ts:
+                    del self._due[key]
+                    out.append(key)
+        return out
+
+    def next_due(self):
+        with self._lock:
+            return self._heap[0][0] if self._heap else None
+
+    async def run(self, on_expire):
+        """
+        Panggil `await on_expire(key)` tepat saat entry jatuh tempo
+        """
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+
+        while True:
+            for key in self.pop_due(time.time()):
+                await on_expire(key)
+
+            self._wake.clear()
+            nxt = self.next_due()
+            timeout = None if nxt is None else max(0.0, nxt - time.time())
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
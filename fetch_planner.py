@@ -0,0 +1,56 @@
+# =========================================================
+# FIXTURE FETCH PLANNER
+# =========================================================
+STRATEGIES = ("date", "league")
+
+
+class FetchPlanner:
+    """
+    Pilih strategi fetch fixture per tanggal:
+    - "date"   : 1 request /fixtures?date=..., payload = jadwal seluruh dunia
+    - "league" : 1 request per liga (league + season), payload = liga yang dianalisa saja
+
+    Biaya = jumlah request * request_cost + perkiraan jumlah item payload.
+    Perkiraan item di-update (EWMA) dari response yang benar-benar diterima.
+    Tiap request memakan kuota harian api-sports, jadi request_cost dibuat
+    setara payload "date" penuh: "league" hanya menang untuk 1 liga saja
+    atau bila payload "date" jauh lebih besar dari biasanya.
+    """
+
+    def __init__(
+        self,
+        request_cost: float = 2000,
+        date_items: float = 1200,
+        league_items: float = 8,
+        alpha: float = 0.3,
+        force: str | None = None,
+    ):
+        self.request_cost = request_cost
+        self.estimates = {"date": date_items, "league": league_items}
+        self.alpha = alpha
+        self.force = force if force in STRATEGIES else None
+
+    def cost(self, strategy: str, n_leagues: int, extra_requests: int = 0) -> float:
+        if strategy == "date":
+            return self.request_cost + self.estimates["date"]
+
+        requests = n_leagues + extra_requests
+        return requests * self.request_cost + n_leagues * self.estimates["league"]
+
+    def plan(self, n_leagues: int, unknown_seasons: int = 0) -> str:
+        """
+        unknown_seasons = request tambahan untuk lookup season liga
+        """
+        if self.force:
+            return self.force
+
+        league_cost = self.cost("league", n_leagues, unknown_seasons)
+        date_cost = self.cost("date", n_leagues)
+        return "league" if league_cost < date_cost else "date"
+
+    def observe(self, strategy: str, items: int):
+        """
+        items = jumlah item dalam SATU response strategi tsb
+        """
+        old = self.estimates[strategy]
+        self.estimates[strategy] = old + self.alpha * (items - old)
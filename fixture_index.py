@@ -0,0 +1,75 @@
+import bisect
+import heapq
+from datetime import datetime
+
+
+class FixtureIndex:
+    """
+    Fixture terurut kickoff dengan datetime yang sudah di-parse sekali.
+    Query "upcoming" = bisect + slice, lookup liga / tanggal O(1) per key.
+    """
+
+    def __init__(self, fixtures: list):
+        rows = sorted(
+            ((datetime.fromisoformat(f["kickoff"]), f) for f in fixtures),
+            key=lambda r: r[0],
+        )
+
+        self.kickoffs = [k for k, _ in rows]
+        self.fixtures = [f for _, f in rows]
+
+        self._kickoff_by_fid = {}
+        self._league = {}   # league_id -> (kickoffs, fixtures)
+        self._date = {}     # "YYYY-MM-DD" -> (kickoffs, fixtures)
+
+        for k, f in rows:
+            self._kickoff_by_fid[f["fixture_id"]] = k
+            self._add(self._league, f.get("league_id"), k, f)
+            self._add(self._date, k.date().isoformat(), k, f)
+
+    def __len__(self):
+        return len(self.fixtures)
+
+    @staticmethod
+    def _add(buckets, key, kickoff, fixture):
+        kickoffs, fixtures = buckets.setdefault(key, ([], []))
+        kickoffs.append(kickoff)
+        fixtures.append(fixture)
+
+    @staticmethod
+    def _slice(kickoffs, fixtures, start, until=None):
+        lo = bisect.bisect_left(kickoffs, start)
+        hi = bisect.bisect_right(kickoffs, until) if until else len(kickoffs)
+        return fixtures[lo:hi]
+
+    def kickoff(self, fid):
+        return self._kickoff_by_fid.get(fid)
+
+    def league(self, league_id) -> list:
+        return self._league.get(league_id, ([], []))[1]
+
+    def date(self, day: str) -> list:
+        return self._date.get(day, ([], []))[1]
+
+    def upcoming(self, now, until=None, leagues=None, day=None) -> list:
+        """
+        Fixture dengan kickoff >= now (dan <= until), terurut kickoff
+        """
+        if day is not None:
+            out = self._slice(*self._date.get(day, ([], [])), now, until)
+            if leagues:
+                out = [f for f in out if f.get("league_id") in leagues]
+            return out
+
+        if leagues:
+            parts = [
+                self._slice(*self._league.get(lid, ([], [])), now, until)
+                for lid in leagues
+            ]
+            if len(parts) == 1:
+                return parts[0]
+            return list(heapq.merge(
+                *parts, key=lambda f: self._kickoff_by_fid[f["fixture_id"]]
+            ))
+
+        return self._slice(self.kickoffs, self.fixtures, now, until)
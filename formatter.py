@@ -125,6 +125,59 @@ def telegram_formatter_technical(
     
     return "\n".join(lines)
 
+def goal_market_lines(markets: dict) -> list[str]:
+    ou = markets["over_under"]
+
+    # garis "wajar" = over paling dekat 50%
+    fair = min(ou, key=lambda k: abs(ou[k]["over"] - 0.5))
+
+    lines = ["*⚽ TOTAL GOL*"]
+    for line in ("1.5", "2.5", "3.5"):
+        lines.append(
+            f"O/U {line}: Over *{ou[line]['over'] * 100:.0f}%* | "
+            f"Under *{ou[line]['under'] * 100:.0f}%*"
+        )
+    lines.append(f"Garis wajar: *{fair}*")
+    lines.append(
+        f"BTTS: Ya *{markets['btts']['yes'] * 100:.0f}%* | "
+        f"Tidak *{markets['btts']['no'] * 100:.0f}%*"
+    )
+    lines.append(
+        "Skor tepat: " + ", ".join(
+            f"{cs['score']} ({cs['prob'] * 100:.0f}%)"
+            for cs in markets["correct_scores"][:3]
+        )
+    )
+    return lines
+
+
+def value_lines(value: dict) -> list[str]:
+    lines = [f"*💰 HARGA PASAR ({value['bookmaker']})*"]
+
+    best = value.get("best_hdp")
+    if best:
+        lines.append(
+            f"HDP {best['side']} {best['line']:+} @{best['odd']}: "
+            f"model *{best['model'] * 100:.0f}%* vs pasar "
+            f"*{best['implied'] * 100:.0f}%* ({best['edge'] * 100:+.1f}%)"
+        )
+
+    pick = value.get("pick")
+    if pick:
+        lines.append(
+            f"Unggulan @{pick['odd']}: model *{pick['model'] * 100:.0f}%* vs "
+            f"pasar *{pick['implied'] * 100:.0f}%* ({pick['edge'] * 100:+.1f}%)"
+        )
+
+    ou = [e for e in value.get("over_under", []) if e["line"] == 2.5]
+    if ou:
+        e = max(ou, key=lambda x: x["edge"])
+        lines.append(
+            f"{e['side']} 2.5 @{e['odd']}: edge *{e['edge'] * 100:+.1f}%*"
+        )
+    return lines
+
+
 def telegram_formatter_full(
     fixture: dict,
     home_scores: dict,
@@ -133,6 +186,8 @@ def telegram_formatter_full(
     hdp: dict,
     hdp_info: dict,
     sync: dict,
+    stale: bool = False,
+    value: dict = None,
 ) -> str:
     base = telegram_formatter_technical(
         fixture=fixture,
@@ -143,6 +198,8 @@ def telegram_formatter_full(
     )
 
     lines = [base]
+    if stale:
+        lines.append("⏳ _Data prediksi lama, sedang diperbarui_")
     lines.append("━━━━━━━━━━━━━━━━━━━━")
     lines.append("*🎯 PREDIKSI & SARAN*")
     lines.append(f"Unggulan: *{decision['pick']}*")
@@ -167,7 +224,27 @@ def telegram_formatter_full(
     lines.append(
         f"Cover Prob: *{int(hdp_info['cover_prob'] * 100)}%*"
     )
+
+    curve = hdp.get("cover_curve")
+    if curve:
+        side = hdp["best_hdp_side"].lower()
+        best = float(hdp["best_hdp"].split()[0])
+        points = [
+            f"{p['line']:+} {p[side] * 100:.0f}%"
+            for p in curve if abs(p["line"] - best) <= 0.5
+        ]
+        lines.append(f"Kurva cover {hdp['best_hdp_side']}: " + " | ".join(points))
     lines.append("")
+
+    markets = hdp.get("markets")
+    if markets:
+        lines.extend(goal_market_lines(markets))
+        lines.append("")
+
+    if value and (value.get("best_hdp") or value.get("pick")):
+        lines.extend(value_lines(value))
+        lines.append("")
+
     lines.append(f"{sync['tag']}")
     lines.append(f"🧠 {sync['note']}")
 
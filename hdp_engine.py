@@ -1,5 +1,7 @@
 import math
 
+import tuning
+
 # =========================================================
 # CORE MATH
 # =========================================================
@@ -8,28 +10,82 @@ def poisson(lmbda: float, k: int) -> float:
     return (math.exp(-lmbda) * (lmbda ** k)) / math.factorial(k)
 
 
-def expected_goals(team: dict, is_home: bool = True) -> float:
+def venue_average(team: dict, kind: str, venue: str):
+    """
+    Rata-rata gol musim ini (kind "for"/"against") di kandang/tandang:
+    1) league stats bawaan /predictions
+    2) season_stats dari cache /teams/statistics (lihat main.get_team_stats)
+    """
+    for src in (team.get("league"), team.get("season_stats")):
+        try:
+            return float(src["goals"][kind]["average"][venue])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return None
+
+
+def expected_goals(team: dict, is_home: bool = True, opponent: dict = None) -> float:
     """
     Expected goals:
-    1) League avg (home/away)
-    2) Fallback ke last 5 avg
+    1) Rata-rata gol tim (home/away) dipadukan dengan rata-rata kebobolan
+       lawan di venue sebaliknya
+    2) Rata-rata gol tim (home/away) saja
+    3) Fallback ke last 5 avg
     """
-    try:
-        return float(
-            team["league"]["goals"]["for"]["average"][
-                "home" if is_home else "away"
-            ]
-        )
-    except Exception:
+    venue, opp_venue = ("home", "away") if is_home else ("away", "home")
+
+    attack = venue_average(team, "for", venue)
+    if attack is None:
         return float(team["last_5"]["goals"]["for"]["average"])
 
+    conceded = venue_average(opponent or {}, "against", opp_venue)
+    if conceded is None:
+        return attack
+    return (attack + conceded) / 2
 
-def poisson_probs(home_xg: float, away_xg: float, max_goals: int = 5):
-    home = draw = away = 0.0
 
-    for h in range(max_goals + 1):
-        for a in range(max_goals + 1):
-            p = poisson(home_xg, h) * poisson(away_xg, a)
+MATRIX_MAX_GOALS = 10
+
+# garis total gol (termasuk quarter line Asia)
+OU_LINES = (1.5, 1.75, 2.0, 2.25, 2.5, 2.75, 3.0, 3.25, 3.5, 3.75, 4.0, 4.25, 4.5)
+TOP_CORRECT_SCORES = 5
+
+
+def score_matrix(home_xg: float, away_xg: float, max_goals: int = MATRIX_MAX_GOALS):
+    """
+    matrix[h][a] = P(skor h-a), dipakai bersama oleh 1X2, O/U, BTTS & skor tepat
+    """
+    home = [poisson(home_xg, k) for k in range(max_goals + 1)]
+    away = [poisson(away_xg, k) for k in range(max_goals + 1)]
+    return [[ph * pa for pa in away] for ph in home]
+
+
+def _over_prob(totals: list, line: float) -> float:
+    """
+    Peluang OVER garis Asia; push / setengah menang dihitung 0.5
+    (konvensi yang sama dengan hdp_cover_prob)
+    """
+    frac = line % 1
+    if frac in (0.25, 0.75):
+        return (_over_prob(totals, line - 0.25) + _over_prob(totals, line + 0.25)) / 2
+
+    over = sum(p for t, p in enumerate(totals) if t > line)
+    if frac == 0:
+        over += totals[int(line)] * 0.5 if int(line) < len(totals) else 0.0
+    return over
+
+
+def goal_markets(matrix: list) -> dict:
+    """
+    1X2, Over/Under, BTTS & skor tepat dalam satu lintasan matrix skor
+    """
+    home = draw = away = btts = 0.0
+    totals = [0.0] * (2 * (len(matrix) - 1) + 1)
+    diffs = {}
+    scores = []
+
+    for h, row in enumerate(matrix):
+        for a, p in enumerate(row):
             if h > a:
                 home += p
             elif h == a:
@@ -37,9 +93,77 @@ def poisson_probs(home_xg: float, away_xg: float, max_goals: int = 5):
             else:
                 away += p
 
-    return home, draw, away
+            if h and a:
+                btts += p
+            totals[h + a] += p
+            diffs[h - a] = diffs.get(h - a, 0.0) + p
+            scores.append((p, h, a))
+
+    mass = home + draw + away
+    over_under = {}
+    for line in OU_LINES:
+        over = _over_prob(totals, line) / mass
+        over_under[str(line)] = {
+            "over": round(over, 3),
+            "under": round(1 - over, 3),
+        }
+
+    scores.sort(reverse=True)
+
+    return {
+        "home": home / mass,
+        "draw": draw / mass,
+        "away": away / mass,
+        "goal_diff": {d: p / mass for d, p in sorted(diffs.items())},
+        "over_under": over_under,
+        "btts": {
+            "yes": round(btts / mass, 3),
+            "no": round(1 - btts / mass, 3),
+        },
+        "correct_scores": [
+            {"score": f"{h}-{a}", "prob": round(p / mass, 3)}
+            for p, h, a in scores[:TOP_CORRECT_SCORES]
+        ],
+    }
 
 
+# =========================================================
+# IN-PLAY
+# =========================================================
+MATCH_MINUTES = 90
+
+
+def inplay_probs(
+    home_xg: float,
+    away_xg: float,
+    elapsed: int,
+    home_goals: int,
+    away_goals: int,
+) -> dict:
+    """
+    Peluang akhir 1X2 saat laga berjalan: sisa gol ~ Poisson(xG x sisa
+    waktu), ditambah skor saat ini
+    """
+    left = max(0, MATCH_MINUTES - (elapsed or 0)) / MATCH_MINUTES
+    rest = goal_markets(score_matrix(home_xg * left, away_xg * left))
+    lead = home_goals - away_goals
+
+    home = draw = away = 0.0
+    for d, p in rest["goal_diff"].items():
+        if d + lead > 0:
+            home += p
+        elif d + lead == 0:
+            draw += p
+        else:
+            away += p
+
+    return {
+        "home": round(home, 3),
+        "draw": round(draw, 3),
+        "away": round(away, 3),
+        "remaining_xg": round((home_xg + away_xg) * left, 2),
+    }
+
 # =========================================================
 # HELPERS
 # =========================================================
@@ -117,6 +241,13 @@ def hdp_cover_prob(
         return min(1.0, max(base, 0.0))
 
         
+def _line_value(hdp: str) -> float:
+    try:
+        return float(hdp.split()[0])
+    except Exception:
+        return 0.0
+
+
 def margin_gap(egd: float, line: float) -> float:
     # clamp biar tidak liar
     return max(-1.5, min(egd - line, 1.5))
@@ -134,7 +265,8 @@ def confidence_label(score: int) -> str:
 # =========================================================
 # POISSON HDP ENGINE (PRIMARY)
 # =========================================================
-def poisson_hdp_engine(pred_resp: dict) -> dict:
+def poisson_hdp_engine(pred_resp: dict, cfg: dict = None) -> dict:
+    tune = (cfg or tuning.current())["hdp"]
     teams = pred_resp["teams"]
     comp = pred_resp.get("comparison", {})
 
@@ -142,15 +274,17 @@ def poisson_hdp_engine(pred_resp: dict) -> dict:
     away = teams["away"]
 
     # === Expected Goals ===
-    home_xg = expected_goals(home, True)
-    away_xg = expected_goals(away, False)
+    home_xg = expected_goals(home, True, away)
+    away_xg = expected_goals(away, False, home)
     
     # === xG stability guard ===
-    home_xg = min(max(home_xg, 0.6), 3.0)
-    away_xg = min(max(away_xg, 0.6), 3.0)
+    home_xg = min(max(home_xg, tune["xg_min"]), tune["xg_max"])
+    away_xg = min(max(away_xg, tune["xg_min"]), tune["xg_max"])
 
-    # === Base Poisson ===
-    p_home, p_draw, p_away = poisson_probs(home_xg, away_xg)
+    # === Base Poisson (satu matrix skor untuk semua pasar) ===
+    markets = goal_markets(score_matrix(home_xg, away_xg))
+    p_home, p_draw, p_away = markets.pop("home"), markets.pop("draw"), markets.pop("away")
+    goal_diff = markets.pop("goal_diff")
 
     # === Adjustments ===
     goals = comp.get("goals", {})
@@ -160,10 +294,11 @@ def poisson_hdp_engine(pred_resp: dict) -> dict:
     def adj(base, a, b, w):
         return adjusted_prob(base, pct(a), pct(b), w)
 
+    w = tune["adjust"]
     home_adjustments = [
-        adj(p_home, goals.get("home"), goals.get("away"), 0.20),
-        adj(p_home, att.get("home"), att.get("away"), 0.15),
-        adj(p_home, defense.get("home"), defense.get("away"), 0.10),
+        adj(p_home, goals.get("home"), goals.get("away"), w["goals"]),
+        adj(p_home, att.get("home"), att.get("away"), w["att"]),
+        adj(p_home, defense.get("home"), defense.get("away"), w["def"]),
     ]
     
     valid_home_adj = [a for a in home_adjustments if a > 0]
@@ -171,9 +306,9 @@ def poisson_hdp_engine(pred_resp: dict) -> dict:
 
 
     away_adjustments = [
-        adj(p_away, goals.get("away"), goals.get("home"), 0.20),
-        adj(p_away, att.get("away"), att.get("home"), 0.15),
-        adj(p_away, defense.get("away"), defense.get("home"), 0.10),
+        adj(p_away, goals.get("away"), goals.get("home"), w["goals"]),
+        adj(p_away, att.get("away"), att.get("home"), w["att"]),
+        adj(p_away, defense.get("away"), defense.get("home"), w["def"]),
     ]
     
     valid_away_adj = [a for a in away_adjustments if a > 0]
@@ -195,46 +330,18 @@ def poisson_hdp_engine(pred_resp: dict) -> dict:
         p_draw_adj /= total
         p_away_adj /= total
 
-    # === Tentukan favorit ===
-    home_fav = p_home_adj >= p_away_adj
-    p_fav = max(p_home_adj, p_away_adj)
-
-    # === Match imbang → jangan maksa HDP ===
-    diff = abs(p_home_adj - p_away_adj)
-
-    imbang = (
-        diff < 0.06 and
-        p_draw_adj > 0.28
-    )
-    if imbang:
-        hdp_home = "0 (DNB)"
-        hdp_away = "0 (DNB)"
-    else:
-        line = base_hdp_from_prob(p_fav)
+    # === Optimasi garis HDP atas distribusi selisih gol ===
+    # bentuk distribusi dari Poisson, massa menang/seri/kalah mengikuti
+    # probabilitas yang sudah di-adjust
+    gd = scale_goal_diff(goal_diff, p_home_adj, p_draw_adj, p_away_adj)
+    opt = optimize_hdp(gd, tune["target_cover"], tune["risk_aversion"])
 
-        if home_fav:
-            hdp_home = f"-{line}" if line > 0 else "0 (DNB)"
-            hdp_away = f"+{line + 0.25}"
-        else:
-            hdp_home = f"+{line + 0.25}"
-            hdp_away = f"-{line}"
-    egd = home_xg - away_xg
+    hdp_home = format_line(opt["home"]["line"])
+    hdp_away = format_line(opt["away"]["line"])
 
-    home_cover = hdp_cover_prob(
-        hdp_home, egd, p_home_adj, p_draw_adj
-    )
-    away_cover = hdp_cover_prob(
-        hdp_away, -egd, p_away_adj, p_draw_adj
-    )
-    
-    if home_cover >= away_cover:
-        best_side = "HOME"
-        best_hdp = hdp_home
-        best_cover = home_cover
-    else:
-        best_side = "AWAY"
-        best_hdp = hdp_away
-        best_cover = away_cover
+    best_side = opt["best_side"]
+    best = opt[best_side.lower()]
+    best_hdp = hdp_home if best_side == "HOME" else hdp_away
 
     return {
         "model": "poisson_v2",
@@ -247,25 +354,107 @@ def poisson_hdp_engine(pred_resp: dict) -> dict:
         "away_xg": round(away_xg, 2),
         "best_hdp_side": best_side,
         "best_hdp": best_hdp,
-        "cover_prob": round(best_cover, 3),
+        "cover_prob": round(best["cover"], 3),
+        "risk_adj_cover": round(best["risk_adj"], 3),
+        "cover_curve": opt["curve"],
+        "markets": markets,
+    }
+# =========================================================
+# HDP LINE OPTIMIZER
+# =========================================================
+# target cover & risk aversion: lihat tuning.DEFAULT_CONFIG["hdp"]
+HDP_LINES = tuple(x / 4 for x in range(-12, 13))   # -3.0 ... +3.0
 
+
+def format_line(line: float) -> str:
+    if line == 0:
+        return "0 (DNB)"
+    return f"{line:+}"
+
+
+def scale_goal_diff(goal_diff: dict, p_home: float, p_draw: float, p_away: float) -> dict:
+    raw_home = sum(p for d, p in goal_diff.items() if d > 0)
+    raw_away = sum(p for d, p in goal_diff.items() if d < 0)
+    raw_draw = goal_diff.get(0, 0.0)
+
+    def k(target, raw):
+        return target / raw if raw > 0 else 0.0
+
+    kh, kd, ka = k(p_home, raw_home), k(p_draw, raw_draw), k(p_away, raw_away)
+    return {
+        d: p * (kh if d > 0 else ka if d < 0 else kd)
+        for d, p in goal_diff.items()
     }
-def base_hdp_from_prob(p: float) -> float:
+
+
+def _ret(margin: float) -> float:
+    # hasil taruhan even-money: menang +1, push 0, kalah -1
+    return 1.0 if margin > 0 else -1.0 if margin < 0 else 0.0
+
+
+def line_settlement(goal_diff: dict, line: float, side: str, risk_aversion: float):
     """
-    Mapping probability favorit → garis handicap Asia
+    → (cover, risk_adj) untuk `side` dengan handicap `line`.
+    cover = (1 + E[hasil]) / 2, jadi push = 0.5 dan half win/loss = 0.75/0.25.
+    risk_adj = cover dikurangi penalti simpangan baku hasil.
     """
-    if p < 0.44:
-        return 0.0
-    elif p < 0.50:
-        return 0.25
-    elif p < 0.56:
-        return 0.5
-    elif p < 0.64:
-        return 0.75
-    elif p < 0.68:
-        return 1.0
+    quarter = line % 0.5 != 0
+    mean = sq = 0.0
+
+    for d, p in goal_diff.items():
+        m = (d if side == "home" else -d) + line
+        r = (_ret(m - 0.25) + _ret(m + 0.25)) / 2 if quarter else _ret(m)
+        mean += p * r
+        sq += p * r * r
+
+    sd = math.sqrt(max(0.0, sq - mean * mean))
+    cover = (1 + mean) / 2
+    return cover, cover - risk_aversion * sd / 2
+
+
+def optimize_hdp(goal_diff: dict, target_cover: float, risk_aversion: float) -> dict:
+    """
+    Evaluasi semua garis Asia -3.0..+3.0 untuk kedua sisi.
+    Per sisi dipilih garis paling berat (paling banyak memberi / paling
+    sedikit menerima gol) yang risk-adjusted cover-nya >= target_cover;
+    kalau tidak ada, garis dengan risk-adjusted cover tertinggi.
+    Best side = sisi dengan garis terpilih paling berat.
+    """
+    curve = []
+    best = {}
+
+    for line in HDP_LINES:
+        point = {"line": line}
+        for side in ("home", "away"):
+            cover, risk_adj = line_settlement(goal_diff, line, side, risk_aversion)
+            point[side] = round(cover, 3)
+
+            cand = {"line": line, "cover": cover, "risk_adj": risk_adj}
+            cur = best.get(side)
+            if cur is None:
+                best[side] = cand
+            elif risk_adj >= target_cover:
+                # HDP_LINES naik, jadi garis memenuhi target pertama = paling berat
+                if cur["risk_adj"] < target_cover:
+                    best[side] = cand
+            elif cur["risk_adj"] < target_cover and risk_adj > cur["risk_adj"]:
+                best[side] = cand
+        curve.append(point)
+
+    home, away = best["home"], best["away"]
+    if (home["line"], -home["risk_adj"]) <= (away["line"], -away["risk_adj"]):
+        best_side = "HOME"
     else:
-        return 1.25
+        best_side = "AWAY"
+
+    return {"curve": curve, "home": home, "away": away, "best_side": best_side}
+
+
+def curve_cover(curve: list, line: float, side: str):
+    for point in curve:
+        if point["line"] == line:
+            return point[side]
+    return None
 
 # =========================================================
 # SIMPLE FALLBACK ENGINE
@@ -336,15 +525,28 @@ def hdp_confidence(
     egd_away = -egd_home
 
     # === COVER PROBABILITY ===
-    home_cover = hdp_cover_prob(
-        hdp_home, egd_home, p_home, p_draw
-    )
-    away_cover = hdp_cover_prob(
-        hdp_away, egd_away, p_away, p_draw
-    )
+    home_cover = away_cover = None
+    curve = hdp_resp.get("cover_curve")
+    if curve:
+        home_cover = curve_cover(curve, _line_value(hdp_home), "home")
+        away_cover = curve_cover(curve, _line_value(hdp_away), "away")
+
+    if home_cover is None or away_cover is None:
+        home_cover = hdp_cover_prob(
+            hdp_home, egd_home, p_home, p_draw
+        )
+        away_cover = hdp_cover_prob(
+            hdp_away, egd_away, p_away, p_draw
+        )
 
     # === PILIH SISI TERBAIK ===
-    if home_cover >= away_cover:
+    # optimizer sudah memilih sisi; tanpa kurva pakai cover tertinggi
+    if curve and hdp_resp.get("best_hdp_side") in ("HOME", "AWAY"):
+        home_best = hdp_resp["best_hdp_side"] == "HOME"
+    else:
+        home_best = home_cover >= away_cover
+
+    if home_best:
         cover_prob = home_cover
         chosen_hdp = hdp_home
     else:
@@ -373,8 +575,8 @@ def hdp_confidence(
 
     result = {
         "score": int(round(max(0, min(score, 100)))),
-        "best_side": "HOME" if home_cover >= away_cover else "AWAY",
-        "cover_prob": round(max(home_cover, away_cover), 3),
+        "best_side": "HOME" if home_best else "AWAY",
+        "cover_prob": round(cover_prob, 3),
     }
     
     result["label"] = confidence_label(result["score"])
@@ -384,9 +586,9 @@ def hdp_confidence(
 # =========================================================
 # PUBLIC API
 # =========================================================
-def hdp_suggestion(pred_resp: dict) -> dict:
+def hdp_suggestion(pred_resp: dict, cfg: dict = None) -> dict:
     try:
-        return poisson_hdp_engine(pred_resp)
+        return poisson_hdp_engine(pred_resp, cfg)
     except Exception:
         return simple_hdp_engine(pred_resp)
 
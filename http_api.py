@@ -0,0 +1,109 @@
+import json
+import asyncio
+import hashlib
+from urllib.parse import urlsplit, parse_qs
+
+REASONS = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+READ_TIMEOUT = 10
+MAX_HEADERS = 100
+
+
+class JsonApi:
+    """
+    Server HTTP/1.1 minimal (asyncio.start_server), read-only, JSON saja.
+    Handler route: fn(params: dict, tail: str) -> (status, payload), dipanggil
+    langsung di event loop, jadi harus cepat & tanpa I/O.
+    Tiap response 200 membawa ETag; If-None-Match yang cocok → 304 tanpa body.
+    """
+
+    def __init__(self):
+        self._exact = {}
+        self._prefix = []
+
+    def route(self, path: str, handler, prefix: bool = False):
+        if prefix:
+            self._prefix.append((path, handler))
+        else:
+            self._exact[path] = handler
+
+    def dispatch(self, method: str, target: str):
+        if method not in ("GET", "HEAD"):
+            return 405, {"error": "method not allowed"}
+
+        url = urlsplit(target)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        handler = self._exact.get(url.path)
+        if handler is not None:
+            return handler(params, "")
+        for path, handler in self._prefix:
+            if url.path.startswith(path):
+                return handler(params, url.path[len(path):])
+        return 404, {"error": "not found"}
+
+    async def handle(self, reader, writer):
+        try:
+            line = await asyncio.wait_for(reader.readline(), READ_TIMEOUT)
+            headers = {}
+            for _ in range(MAX_HEADERS):
+                h = await asyncio.wait_for(reader.readline(), READ_TIMEOUT)
+                if h in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = h.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            try:
+                method, target, _ = line.decode("latin-1").split()
+                status, payload = self.dispatch(method, target)
+            except ValueError:
+                method, (status, payload) = "GET", (400, {"error": "bad request"})
+            except Exception:
+                method, (status, payload) = "GET", (500, {"error": "internal error"})
+
+            body = json.dumps(
+                payload, ensure_ascii=False, default=str, separators=(",", ":")
+            ).encode()
+            etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+            if status == 200 and etag_matches(headers.get("if-none-match"), etag):
+                status, body = 304, b""
+
+            head = [
+                f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                "Content-Type: application/json; charset=utf-8",
+                f"Content-Length: {len(body)}",
+                f"ETag: {etag}",
+                "Cache-Control: no-cache",
+                "Connection: close",
+            ]
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode())
+            if method != "HEAD":
+                writer.write(body)
+            await writer.drain()
+
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str, port: int):
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def etag_matches(header, etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    tags = [t.strip() for t in header.split(",")]
+    return any(t == etag or t == "W/" + etag for t in tags)
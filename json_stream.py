@@ -0,0 +1,109 @@
+import codecs
+import json
+
+_DECODER = json.JSONDecoder()
+_WS = " \t\n\r"
+
+
+class _Buffer:
+    """
+    Buffer teks dari stream bytes; bagian yang sudah di-decode dibuang
+    saat refill, jadi memori hanya sebesar item yang sedang dibaca.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+
+        data = ""
+        for chunk in self._chunks:
+            data = self._utf8.decode(chunk)
+            if data:
+                break
+        else:
+            data = self._utf8.decode(b"", final=True)
+            self.eof = True
+
+        self.text = self.text[self.pos:] + data
+        self.pos = 0
+        return bool(data)
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return None
+
+    def expect(self, ch: str):
+        if self.peek() != ch:
+            raise ValueError(f"JSON stream: '{ch}' diharapkan di posisi {self.pos}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+
+            # angka di ujung buffer bisa saja masih terpotong
+            if end == len(self.text) and self.fill():
+                continue
+
+            self.pos = end
+            return obj
+
+
+def iter_array_items(chunks, key: str = "response", fields: dict | None = None):
+    """
+    Yield item array `key` pada object top-level satu per satu
+    dari iterator chunk bytes (mis. requests iter_content).
+    Key top-level lain disimpan ke `fields` (jika diberikan), mis. "errors".
+    """
+    buf = _Buffer(chunks)
+    buf.expect("{")
+
+    while True:
+        c = buf.peek()
+        if c == "}":
+            return
+        if c == ",":
+            buf.pos += 1
+            continue
+        if c is None:
+            raise ValueError("JSON stream terpotong")
+
+        name = buf.value()
+        buf.expect(":")
+
+        if name != key:
+            value = buf.value()
+            if fields is not None:
+                fields[name] = value
+            continue
+
+        buf.expect("[")
+        while True:
+            c = buf.peek()
+            if c == "]":
+                buf.pos += 1
+                break
+            if c == ",":
+                buf.pos += 1
+                continue
+            if c is None:
+                raise ValueError("JSON stream terpotong")
+            yield buf.value()
@@ -0,0 +1,57 @@
+def slim_live(f):
+    """
+    Item /fixtures?live=... → field yang dipakai live tracking
+    """
+    return {
+        "fixture_id": f["fixture"]["id"],
+        "league_id": f["league"]["id"],
+        "league_name": f["league"]["name"],
+        "home": f["teams"]["home"]["name"],
+        "away": f["teams"]["away"]["name"],
+        "status": f["fixture"]["status"]["short"],
+        "elapsed": f["fixture"]["status"].get("elapsed") or 0,
+        "goals_home": f["goals"]["home"] or 0,
+        "goals_away": f["goals"]["away"] or 0,
+    }
+
+
+def diff_snapshots(prev: dict, curr: dict, missing: dict, grace: int = 2) -> list:
+    """
+    Bandingkan dua snapshot {fixture_id: slim_live}. Hanya perubahan skor
+    & status yang jadi event; menit berjalan diabaikan.
+    Fixture yang hilang dari snapshot baru dianggap selesai ("FT") setelah
+    absen `grace` poll berturut-turut. Hitungannya disimpan di `missing`
+    ({fixture_id: (jumlah absen, data terakhir)}) antar panggilan.
+    """
+    events = []
+
+    for fid, m in curr.items():
+        old = prev.get(fid)
+        if old is None and fid in missing:
+            old = missing.pop(fid)[1]   # sempat hilang, ternyata masih jalan
+        if old is None:
+            events.append({"type": "status", "match": m, "prev_status": "NS"})
+            continue
+
+        if (m["goals_home"], m["goals_away"]) != (old["goals_home"], old["goals_away"]):
+            events.append({"type": "goal", "match": m, "prev": old})
+        elif m["status"] != old["status"]:
+            events.append({"type": "status", "match": m, "prev_status": old["status"]})
+
+    for fid, old in prev.items():
+        if fid not in curr:
+            missing.setdefault(fid, (0, old))
+
+    for fid in [fid for fid in missing if fid not in curr]:
+        count, old = missing[fid]
+        if count + 1 < grace:
+            missing[fid] = (count + 1, old)
+            continue
+        del missing[fid]
+        events.append({
+            "type": "status",
+            "match": dict(old, status="FT"),
+            "prev_status": old["status"],
+        })
+
+    return events
@@ -1,12 +1,15 @@
 import os
-import json
 import requests
 import logging
 import asyncio
+import time
+import threading
+import tracemalloc
 from datetime import datetime, timedelta, date
-from zoneinfo import ZoneInfo
+from collections import defaultdict
 
 from telegram import Update
+from telegram.error import Forbidden, RetryAfter
 from telegram.ext import (
     ApplicationBuilder,
     CommandHandler,
@@ -15,25 +18,66 @@ from telegram.ext import (
     filters,
 )
 
-from engine import factor_scores, final_decision, sync_confidence
+from analysis import analyze_prediction
+from engine import EXTRACTORS
 from formatter import telegram_formatter_technical, telegram_formatter_full
-from hdp_engine import hdp_suggestion, hdp_confidence
+from hdp_engine import inplay_probs, venue_average
+from odds import parse_odds_item
+import cache_io
+import metrics
+import profiler
+import tracing
+import tuning
+import prediction_store
+import refresh_policy
+from cache_paths import (
+    CACHE_DIR,
+    TIMEZONE,
+    TUNING_FILE,
+    WITA,
+    broadcast_cursor_path,
+    broadcast_progress_path,
+    fixture_cache_path,
+    odds_cache_path,
+    prediction_cache_path,
+    read_prediction_cache,
+    today_str,
+)
+from circuit import CircuitBreaker, CircuitOpenError
+from expiry import ExpiryHeap
+from fetch_planner import FetchPlanner
+from fixture_index import FixtureIndex
+from http_api import JsonApi
+from json_stream import iter_array_items
+from live import diff_snapshots, slim_live
+from ratelimit import ChatThrottle, RateLimiter
+from ranking import RankedIndex
+from tracing import span, traced
 
 # ================= CONFIG =================
 BOT_TOKEN = os.getenv("BOT_TOKEN")      
+# dicek saat request pertama ke api-sports (dan saat bot start), bukan
+# saat import: batch.py bisa memakai cache tanpa API_KEY
 API_KEY = os.getenv("API_KEY")
-if not API_KEY:
-    raise RuntimeError("API_KEY belum diset di environment")
-    
+
 ADMIN_IDS = {7952198349}
 
-API_URL = "https://v3.football.api-sports.io"
-TIMEZONE = "Asia/Makassar"
-WITA = ZoneInfo(TIMEZONE)
+API_URL = os.getenv("API_URL", "https://v3.football.api-sports.io")
 
-CACHE_DIR = os.getenv("CACHE_DIR", "/app/cache")
 os.makedirs(CACHE_DIR, exist_ok=True)
 
+# jumlah hari fixture yang di-cache (hari ini + N-1 hari ke depan)
+FIXTURE_HORIZON_DAYS = int(os.getenv("FIXTURE_HORIZON_DAYS", "2"))
+FIXTURE_REFRESH_MINUTES = int(os.getenv("FIXTURE_REFRESH_MINUTES", "60"))
+FIXTURE_DROP_STATUS = {"PST", "CANC", "ABD", "SUSP", "AWD", "WO"}
+
+# strategi fetch fixture: auto | date | league
+FIXTURE_FETCH_STRATEGY = os.getenv("FIXTURE_FETCH_STRATEGY", "auto")
+# bobot 1 request (kuota api-sports) dalam satuan item payload
+FETCH_REQUEST_COST = float(os.getenv("FETCH_REQUEST_COST", "2000"))
+FETCH_TRACE_MEMORY = os.getenv("FETCH_TRACE_MEMORY") == "1"
+FIXTURE_STREAM_CHUNK = 64 * 1024
+
 ALLOWED_LEAGUES = {
     1, 2, 3, 39, 61, 78, 88, 98, 113, 119, 135, 140, 144, 253, 292, 307
 }
@@ -58,12 +102,105 @@ SUPPORTED_LEAGUES_TEXT = (
     "⚠️ Liga lain tidak dianalisa."
 )
 
+# alias argumen /prediksi & /liga → league id
+LEAGUE_ALIASES = {
+    "wc": 1, "worldcup": 1,
+    "ucl": 2,
+    "uel": 3,
+    "epl": 39, "pl": 39,
+    "ligue1": 61,
+    "bundesliga": 78, "bl": 78,
+    "eredivisie": 88,
+    "j1": 98,
+    "allsvenskan": 113,
+    "superliga": 119,
+    "seriea": 135,
+    "laliga": 140,
+    "jupiler": 144,
+    "mls": 253,
+    "kleague": 292,
+    "saudi": 307,
+}
+PREDIKSI_PAGE_SIZE = 10
+PREDICTION_CONCURRENCY = 4
+# batas waktu total /prediksi (fetch + hitung + kirim)
+PREDIKSI_DEADLINE_SECONDS = float(os.getenv("PREDIKSI_DEADLINE_SECONDS", "40"))
+# jeda pembersihan analisa yang sudah kickoff (ANALYSES & RANKING)
+ANALYSIS_PRUNE_SECONDS = int(os.getenv("ANALYSIS_PRUNE_SECONDS", "600"))
+TOP_DEFAULT = 5
+TOP_MAX = 20
+# /prediksi & /top diulang dalam jendela ini (detik) tidak dihitung ulang
+COMMAND_THROTTLE_SECONDS = float(os.getenv("COMMAND_THROTTLE_SECONDS", "60"))
+
+# Live mode (opt-in): satu poll /fixtures?live=... untuk semua pelanggan
+LIVE_MODE = os.getenv("LIVE_MODE") == "1"
+LIVE_POLL_SECONDS = float(os.getenv("LIVE_POLL_SECONDS", "60"))
+# fixture baru dianggap FT setelah absen sekian poll berturut-turut
+LIVE_FT_GRACE_POLLS = int(os.getenv("LIVE_FT_GRACE_POLLS", "2"))
+
+# Broadcast harian (opt-in): BROADCAST_AT="HH:MM" WITA, kosong = mati
+BROADCAST_AT = os.getenv("BROADCAST_AT", "")
+BROADCAST_TOP = int(os.getenv("BROADCAST_TOP", "10"))
+BROADCAST_PER_MINUTE = float(os.getenv("BROADCAST_PER_MINUTE", "1200"))
+# batas waktu hitung slate & jeda coba ulang bila broadcast gagal
+BROADCAST_BUILD_SECONDS = float(os.getenv("BROADCAST_BUILD_SECONDS", "300"))
+BROADCAST_RETRY_MINUTES = float(os.getenv("BROADCAST_RETRY_MINUTES", "10"))
+
+# JSON API read-only untuk service lain (opt-in): HTTP_API_PORT kosong = mati
+HTTP_API_HOST = os.getenv("HTTP_API_HOST", "127.0.0.1")
+HTTP_API_PORT = int(os.getenv("HTTP_API_PORT", "0"))
+HTTP_API_SLATE_MAX = 100
+
+# /profile (admin): batas sampling & umur file profil di CACHE_DIR
+PROFILE_SAMPLE_MAX_SECONDS = 60
+PROFILE_KEEP_DAYS = 7
+
+# pipeline faktor & angka tuning engine (lihat tuning.DEFAULT_CONFIG) ada
+# di TUNING_FILE (cache_paths), dibaca ulang otomatis saat file berubah
+TUNING_CHECK_SECONDS = float(os.getenv("TUNING_CHECK_SECONDS", "30"))
+
+USAGE_TEXT = (
+    "Gunakan /prediksi atau /jadwal\n"
+    "Contoh: `/prediksi epl`, `/prediksi besok`, `/prediksi 3` (kickoff 3 jam ke depan)\n"
+    "Simpan liga favorit: `/liga epl laliga`\n"
+    "Pick terbaik: `/top 5`\n"
+    + ("Update skor live: `/live`\n" if LIVE_MODE else "")
+    + ("Kiriman pick harian: `/langganan`\n" if BROADCAST_AT else "")
+    + "\n"
+)
+
 HEADERS = {"x-apisports-key": API_KEY}
 
+# TTL prediksi adaptif (lihat refresh_policy.DEFAULT_POLICY) & kuota
+# refresh terjadwal ke api-sports
+PREDICTION_TTL_POLICY = refresh_policy.parse_policy(
+    os.getenv("PREDICTION_TTL_POLICY", refresh_policy.DEFAULT_POLICY)
+)
+API_REFRESH_PER_MINUTE = float(os.getenv("API_REFRESH_PER_MINUTE", "10"))
+# jatah refresh background per hari (WITA), 0 = tanpa batas
+API_REFRESH_PER_DAY = int(os.getenv("API_REFRESH_PER_DAY", "1500"))
+# hanya fixture yang diminta user dalam jendela ini (jam) yang di-refresh
+REFRESH_IDLE_HOURS = float(os.getenv("REFRESH_IDLE_HOURS", "6"))
+
+# Odds bandar (/odds per tanggal, ber-halaman). Opt-in karena satu tanggal
+# bisa makan puluhan request kuota.
+ODDS_ENABLED = os.getenv("ODDS_ENABLED") == "1"
+ODDS_BOOKMAKER = int(os.getenv("ODDS_BOOKMAKER", "8"))    # 8 = Bet365
+ODDS_MAX_PAGES = int(os.getenv("ODDS_MAX_PAGES", "30"))
+
+# statistik musim per tim (/teams/statistics), dipakai bersama semua fixture
+TEAM_STATS_TTL_HOURS = float(os.getenv("TEAM_STATS_TTL_HOURS", "24"))
+
+API_BREAKER = CircuitBreaker(
+    failure_threshold=int(os.getenv("API_BREAKER_FAILURES", "5")),
+    reset_timeout=float(os.getenv("API_BREAKER_RESET_SECONDS", "60")),
+)
+
 logging.basicConfig(
     level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+    format="%(asctime)s [%(levelname)s] %(name)s [%(trace_id)s]: %(message)s"
 )
+tracing.install_log_filter()
 
 logger = logging.getLogger("BOT")
 
@@ -73,152 +210,429 @@ logging.getLogger("telegram").setLevel(logging.WARNING)
 
 MAX_MSG_LEN = 3800  # aman, di bawah limit telegram
 
-async def send_long_message(update, text, parse_mode="Markdown"):
+def split_message(text):
     chunk = ""
     for line in text.split("\n"):
         if len(chunk) + len(line) + 1 > MAX_MSG_LEN:
-            await update.message.reply_text(chunk, parse_mode=parse_mode)
+            yield chunk
             chunk = line + "\n"
         else:
             chunk += line + "\n"
 
     if chunk.strip():
-        await update.message.reply_text(chunk, parse_mode=parse_mode)
+        yield chunk
 
-# ================= UTIL =================
-def _today_str():
-    return datetime.now(WITA).strftime("%Y-%m-%d")
+async def send_long_message(update, text, parse_mode="Markdown"):
+    """
+    → pesan pertama yang terkirim (None jika teks kosong)
+    """
+    first = None
+    for chunk in split_message(text):
+        with span("telegram.send", chars=len(chunk)):
+            msg = await update.message.reply_text(chunk, parse_mode=parse_mode)
+        first = first or msg
+    return first
 
+# ================= UTIL =================
 def _date_str(offset_days: int = 0):
     return (datetime.now(WITA) + timedelta(days=offset_days)).strftime("%Y-%m-%d")
 
-def fixture_cache_path():
-    return os.path.join(CACHE_DIR, f"fixtures_{_today_str()}.json")
-
-def prediction_cache_path(fid: int):
-    return os.path.join(CACHE_DIR, f"prediction_{fid}.json")
+def horizon_dates():
+    return [_date_str(i) for i in range(FIXTURE_HORIZON_DAYS)]
 
-def extract_confidence_percent(conf_str) -> int:
-    try:
-        return int(str(conf_str).split("(")[1].replace("%)", ""))
-    except Exception:
-        return 50
-        
 def safe_get(url, timeout=15, **kwargs):
+    if not API_KEY:
+        raise RuntimeError("API_KEY belum diset di environment")
+    # breaker terbuka → tolak langsung, jangan blok menunggu timeout
+    if not API_BREAKER.allow():
+        metrics.incr("api.breaker_rejected")
+        raise CircuitOpenError("api-sports sedang tidak tersedia")
+
     last_exc = None
     for _ in range(2):
         try:
             r = requests.get(url, timeout=timeout, **kwargs)
             r.raise_for_status()
+            API_BREAKER.record_success()
             return r
         except Exception as e:
             last_exc = e
+
+    API_BREAKER.record_failure()
+    metrics.gauge("api.breaker_state", API_BREAKER.state)
     raise last_exc
 
 USERS_FILE = os.path.join(CACHE_DIR, "users.json")
 # ================= CACHE CLEANUP =================
-LAST_CLEANUP = None
+# Setiap file cache dijadwalkan saat ditulis; task background menghapusnya
+# tepat saat jatuh tempo, tidak ada scan direktori di jalur request.
+CACHE_EXPIRY = ExpiryHeap()
 
 
-def auto_cleanup_cache():
-    global LAST_CLEANUP
-    now = datetime.now(WITA)
-
-    if LAST_CLEANUP and (now - LAST_CLEANUP).seconds < 3600:
-        return
+def fixture_day_expiry(day: str) -> float:
+    # file fixture kadaluarsa saat tanggalnya lewat (00:00 WITA hari berikut)
+    start = datetime.fromisoformat(day).replace(tzinfo=WITA)
+    return (start + timedelta(days=1)).timestamp()
 
-    LAST_CLEANUP = now
 
+def seed_cache_expiry():
+    """
+    Sekali saat start: jadwalkan file cache yang sudah ada di disk
+    """
     for f in os.listdir(CACHE_DIR):
         path = os.path.join(CACHE_DIR, f)
         try:
-            if f.startswith("fixtures_") and _today_str() not in f:
-                os.remove(path)
+            if f.startswith("fixtures_"):
+                CACHE_EXPIRY.schedule(path, fixture_day_expiry(f[9:19]))
+
+            elif f.startswith("odds_"):
+                CACHE_EXPIRY.schedule(path, fixture_day_expiry(f[5:15]))
+
+            elif f.startswith("broadcast_"):
+                CACHE_EXPIRY.schedule(path, fixture_day_expiry(f[10:20]))
+
+            elif f.startswith("profile_"):
+                CACHE_EXPIRY.schedule(
+                    path, os.path.getmtime(path) + PROFILE_KEEP_DAYS * 86400
+                )
 
             elif f.startswith("prediction_"):
-                with open(path) as jf:
-                    payload = json.load(jf)
-                if now >= datetime.fromisoformat(payload["expires_at"]):
-                    os.remove(path)
+                expires_at, stale_until, _ = read_prediction_cache(path)
+                if not stale_until:
+                    cache_io.remove(path)   # format lama / schema beda
+                    continue
+                CACHE_EXPIRY.schedule(
+                    path, datetime.fromisoformat(stale_until).timestamp()
+                )
+                schedule_refresh(
+                    {"fixture_id": int(f[11:-4]), "kickoff": stale_until},
+                    datetime.fromisoformat(expires_at),
+                )
         except Exception:
-            pass
+            logger.exception(f"Gagal membaca cache {f}")
+
+
+def expire_cache_file(path: str):
+    name = os.path.basename(path)
+    if name.startswith("fixtures_"):
+        FIXTURE_DAYS.pop(name[9:19], None)
+    elif name.startswith("odds_"):
+        ODDS_DAYS.pop(name[5:15], None)
+    cache_io.remove(path)
+    metrics.incr("cache.expired")
+
+
+async def cache_maintenance_loop():
+    await cache_io.run(seed_cache_expiry)
+    metrics.gauge("cache.scheduled", len(CACHE_EXPIRY))
+
+    async def on_expire(path):
+        try:
+            await cache_io.run(expire_cache_file, path)
+        except Exception:
+            logger.exception(f"Gagal menghapus cache {path}")
+        metrics.gauge("cache.scheduled", len(CACHE_EXPIRY))
+
+    await CACHE_EXPIRY.run(on_expire)
 
 # ================= USERS =================
-def load_users():
-    if not os.path.exists(USERS_FILE):
-        return {}
-    with open(USERS_FILE) as f:
-        return json.load(f)
+USERS = None
+
 
+async def load_users():
+    """
+    users.json dibaca sekali lalu disimpan di memori
+    """
+    global USERS
+    with span("users.load", cached=USERS is not None):
+        if USERS is None:
+            USERS = await cache_io.aread_json(USERS_FILE, {})
+    return USERS
 
-def save_users(data):
-    with open(USERS_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+
+async def save_users(data):
+    await cache_io.awrite_json(USERS_FILE, data, indent=2)
 
 # ================= FIXTURE =================
-def fetch_fixtures():
+FIXTURE_DAYS = {}              # "YYYY-MM-DD" -> {"refreshed_at", "fixtures"}
+FIXTURE_STATE = {"version": 0}
+
+
+FETCH_PLANNER = FetchPlanner(
+    request_cost=FETCH_REQUEST_COST,
+    force=FIXTURE_FETCH_STRATEGY,
+)
+LEAGUE_SEASONS_FILE = os.path.join(CACHE_DIR, "league_seasons.json")
+LEAGUE_SEASONS = {}   # league_id (str) -> season year
+
+
+def _fixtures_request(strategy: str, params: dict):
+    """
+    GET /fixtures dengan decode streaming: item `response` dibaca satu per
+    satu, difilter ALLOWED_LEAGUES lalu dipangkas via slim_fixture, jadi
+    peak memory mengikuti jumlah fixture yang disimpan, bukan seluruh body.
+    Bandwidth, waktu decode & peak memory dicatat per strategi.
+    """
+    r = safe_get(
+        f"{API_URL}/fixtures",
+        headers=HEADERS,
+        params=params,
+        timeout=15,
+        stream=True
+    )
+
+    size = 0
+
+    def chunks():
+        nonlocal size
+        for chunk in r.iter_content(FIXTURE_STREAM_CHUNK):
+            size += len(chunk)
+            yield chunk
+
+    if FETCH_TRACE_MEMORY:
+        tracemalloc.start()
+    t0 = time.perf_counter()
+
+    items = 0
     fixtures = []
+    fields = {}
+    peak = None
+    try:
+        for item in iter_array_items(chunks(), fields=fields):
+            items += 1
+            if item["league"]["id"] in ALLOWED_LEAGUES:
+                fixtures.append(slim_fixture(item))
+    finally:
+        r.close()
+        # selalu dihentikan, juga saat decode gagal / body error
+        if FETCH_TRACE_MEMORY:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    # kuota / rate limit: response kosong + "errors" → jangan di-cache
+    # sebagai hari tanpa fixture
+    if fields.get("errors"):
+        metrics.incr(f"fixtures.{strategy}.api_errors")
+        raise RuntimeError(f"api-sports fixtures error: {fields['errors']}")
+
+    metrics.observe(f"fixtures.{strategy}.decode_s", time.perf_counter() - t0)
+    if peak is not None:
+        metrics.observe(f"fixtures.{strategy}.peak_bytes", peak)
+
+    metrics.incr(f"fixtures.{strategy}.requests")
+    metrics.observe(f"fixtures.{strategy}.bytes", size)
+    metrics.observe(f"fixtures.{strategy}.items", items)
+    metrics.observe(f"fixtures.{strategy}.kept", len(fixtures))
+    FETCH_PLANNER.observe(strategy, items)
+    return fixtures
 
-    for offset in (0, 1):  # hari ini & besok
+
+def _load_league_seasons():
+    if LEAGUE_SEASONS:
+        return
+    payload = cache_io.read_json(LEAGUE_SEASONS_FILE)
+    if not payload:
+        return
+    # season di-refresh mingguan
+    fetched = date.fromisoformat(payload["fetched"])
+    if (date.fromisoformat(today_str()) - fetched).days < 7:
+        LEAGUE_SEASONS.update(payload["seasons"])
+
+
+def league_season(league_id: int):
+    """
+    Season berjalan per liga. Semua liga diambil dalam 1 request
+    /leagues?current=true lalu di-cache mingguan.
+    """
+    _load_league_seasons()
+    if not LEAGUE_SEASONS:
         r = safe_get(
-            f"{API_URL}/fixtures",
+            f"{API_URL}/leagues",
             headers=HEADERS,
-            params={
-                "date": _date_str(offset),
-                "status": "NS",
-                "timezone": TIMEZONE
-            },
+            params={"current": "true"},
             timeout=15
         )
-        r.raise_for_status()
-        fixtures.extend(r.json()["response"])
+        body = r.json()
+        if body.get("errors"):
+            raise RuntimeError(f"api-sports leagues error: {body['errors']}")
+        for item in body["response"]:
+            lid = item["league"]["id"]
+            if lid in ALLOWED_LEAGUES and item["seasons"]:
+                LEAGUE_SEASONS[str(lid)] = item["seasons"][0]["year"]
+
+        cache_io.write_json(
+            LEAGUE_SEASONS_FILE,
+            {"fetched": today_str(), "seasons": LEAGUE_SEASONS}
+        )
+
+    return LEAGUE_SEASONS.get(str(league_id))
+
 
+def fetch_fixtures(day: str):
+    _load_league_seasons()
+    strategy = FETCH_PLANNER.plan(
+        len(ALLOWED_LEAGUES), unknown_seasons=0 if LEAGUE_SEASONS else 1
+    )
+    metrics.incr(f"fixtures.plan.{strategy}")
+
+    if strategy == "date":
+        return _fixtures_request("date", {
+            "date": day,
+            "status": "NS",
+            "timezone": TIMEZONE
+        })
+
+    fixtures = []
+    for lid in sorted(ALLOWED_LEAGUES):
+        season = league_season(lid)
+        if season is None:   # liga sedang libur
+            continue
+        fixtures.extend(_fixtures_request("league", {
+            "league": lid,
+            "season": season,
+            "date": day,
+            "status": "NS",
+            "timezone": TIMEZONE
+        }))
     return fixtures
 
 
-def get_fixtures():
-    path = fixture_cache_path()
-    if os.path.exists(path):
-        with open(path) as f:
-            return json.load(f)
+def slim_fixture(f):
+    kickoff = datetime.fromisoformat(
+        f["fixture"]["date"].replace("Z", "+00:00")
+    ).astimezone(WITA)
+
+    return {
+        "fixture_id": f["fixture"]["id"],
+        "kickoff": kickoff.isoformat(),
+        "status": f["fixture"]["status"]["short"],
+        "league_id": f["league"]["id"],
+        "league_name": f["league"]["name"],
+        "home": f["teams"]["home"]["name"],
+        "away": f["teams"]["away"]["name"],
+    }
+
+
+def _store_fixture_day(day, fixtures):
+    entry = {
+        "refreshed_at": datetime.now(WITA).isoformat(),
+        "fixtures": sorted(fixtures, key=lambda x: x["kickoff"]),
+    }
+    path = fixture_cache_path(day)
+    cache_io.write_json(path, entry)
+    CACHE_EXPIRY.schedule(path, fixture_day_expiry(day))
+
+    FIXTURE_DAYS[day] = entry
+    FIXTURE_STATE["version"] += 1
+    return entry
+
+
+def load_fixture_day(day: str):
+    """
+    Fixture satu tanggal: memori → file cache → API
+    """
+    entry = FIXTURE_DAYS.get(day)
+    if entry is not None:
+        return entry
+
+    with span("fixtures.load_day", day=day) as sp:
+        entry = cache_io.read_json(fixture_cache_path(day))
+        # format lama (list gabungan 2 hari) diabaikan
+        if isinstance(entry, dict):
+            sp["source"] = "disk"
+            FIXTURE_DAYS[day] = entry
+            FIXTURE_STATE["version"] += 1
+            return entry
+
+        sp["source"] = "api"
+        return _store_fixture_day(day, fetch_fixtures(day))
+
 
-    raw = fetch_fixtures()
+def get_fixtures():
     fixtures = []
+    for day in horizon_dates():
+        fixtures.extend(load_fixture_day(day)["fixtures"])
 
-    for f in raw:
-        if f["league"]["id"] not in ALLOWED_LEAGUES:
+    fixtures.sort(key=lambda x: x["kickoff"])
+    return fixtures
+
+
+def refresh_fixture_day(day: str):
+    """
+    Delta refresh: update kickoff & status fixture yang sudah dikenal
+    lewat /fixtures?ids=..., tanpa fetch ulang seluruh jadwal tanggal itu
+    """
+    entry = load_fixture_day(day)
+    ids = [f["fixture_id"] for f in entry["fixtures"]]
+
+    latest = {}
+    for i in range(0, len(ids), 20):  # limit api-sports: 20 id per request
+        r = safe_get(
+            f"{API_URL}/fixtures",
+            headers=HEADERS,
+            params={
+                "ids": "-".join(str(x) for x in ids[i:i + 20]),
+                "timezone": TIMEZONE
+            },
+            timeout=15
+        )
+        for item in r.json()["response"]:
+            latest[item["fixture"]["id"]] = slim_fixture(item)
+
+    fixtures = []
+    changed = False
+    for f in entry["fixtures"]:
+        new = latest.get(f["fixture_id"], f)
+        if new["status"] in FIXTURE_DROP_STATUS:
+            changed = True
             continue
+        if new != f:
+            changed = True
+        fixtures.append(new)
 
-        kickoff = datetime.fromisoformat(
-            f["fixture"]["date"].replace("Z", "+00:00")
-        ).astimezone(WITA)
+    if changed:
+        _store_fixture_day(day, fixtures)
+    else:
+        entry["refreshed_at"] = datetime.now(WITA).isoformat()
 
-        fixtures.append({
-            "fixture_id": f["fixture"]["id"],
-            "kickoff": kickoff.isoformat(),
-            "league_name": f["league"]["name"],
-            "home": f["teams"]["home"]["name"],
-            "away": f["teams"]["away"]["name"],
-        })
 
-    fixtures.sort(key=lambda x: x["kickoff"])
-    with open(path, "w") as f:
-        json.dump(fixtures, f)
+def refresh_fixtures():
+    now = datetime.now(WITA)
+    for day in horizon_dates():
+        entry = load_fixture_day(day)
+        refreshed = datetime.fromisoformat(entry["refreshed_at"])
+        if now - refreshed < timedelta(minutes=FIXTURE_REFRESH_MINUTES):
+            continue
+        try:
+            refresh_fixture_day(day)
+        except Exception:
+            logger.exception(f"Gagal refresh fixture {day}")
 
-    return fixtures
+
+async def fixture_refresh_loop():
+    while True:
+        try:
+            await asyncio.to_thread(refresh_fixtures)
+        except Exception:
+            logger.exception("Error saat refresh fixture")
+        await asyncio.sleep(FIXTURE_REFRESH_MINUTES * 60 / 4)
 
 # ================= PREDICTION =================
-def get_prediction(fixture):
+REFRESH_QUEUE = ExpiryHeap()   # fixture_id -> waktu refresh terjadwal
+REFRESH_FIXTURES = {}          # fixture_id -> {"fixture_id", "kickoff"}
+REFRESH_LIMITER = RateLimiter(API_REFRESH_PER_MINUTE)
+REFRESH_BUDGET = {"day": None, "used": 0}   # jatah API_REFRESH_PER_DAY
+REFRESH_DEMAND = {}  # fixture_id -> time.time() terakhir diminta user
+REFRESHING = set()   # fixture_id yang sedang di-refresh di background
+
+
+def fetch_prediction(fixture):
+    """
+    API → cache. None jika api-sports tidak punya prediksi untuk fixture ini
+    """
     fid = fixture["fixture_id"]
     path = prediction_cache_path(fid)
 
-    if os.path.exists(path):
-        with open(path) as f:
-            payload = json.load(f)
-        if datetime.now(WITA) < datetime.fromisoformat(payload["expires_at"]):
-            return payload["data"]
-        os.remove(path)
-
     r = safe_get(
         f"{API_URL}/predictions",
         headers=HEADERS,
@@ -230,37 +644,625 @@ def get_prediction(fixture):
     data = r.json()["response"]
     if not data:
         return None
-    
-    expires_at = (
-        datetime.fromisoformat(fixture["kickoff"]) - timedelta(minutes=30)
-    ).isoformat()
-    
-    with open(path, "w") as f:
-        json.dump({
-            "expires_at": expires_at,
-            "data": data[0]
-        }, f)
-
-    return data[0]
-
-def collect_predictions():
-    auto_cleanup_cache()
-    fixtures = get_fixtures()
+
+    kickoff = datetime.fromisoformat(fixture["kickoff"])
+    expires_at, refresh_at = refresh_policy.plan_refresh(
+        datetime.now(WITA), kickoff, PREDICTION_TTL_POLICY
+    )
+    # setelah expires_at data masih boleh disajikan (stale) sampai kickoff
+    stale_until = kickoff.isoformat()
+
+    # simpan hanya field yang dipakai engine (lihat prediction_store.FIELDS)
+    record = prediction_store.project(data[0])
+    cache_io.write_atomic(
+        path,
+        prediction_store.dumps(expires_at.isoformat(), stale_until, record)
+    )
+    CACHE_EXPIRY.schedule(path, kickoff.timestamp())
+    if refresh_at:
+        schedule_refresh(fixture, refresh_at)
+    # analisa lama dihitung ulang saat dibutuhkan
+    ANALYSES.pop(fid, None)
+    RANKING.discard(fid)
+
+    return prediction_store.expand(record)
+
+
+def schedule_refresh(fixture, refresh_at):
+    fid = fixture["fixture_id"]
+    REFRESH_FIXTURES[fid] = {"fixture_id": fid, "kickoff": fixture["kickoff"]}
+    REFRESH_QUEUE.schedule(fid, refresh_at.timestamp())
+
+
+def take_refresh_budget():
+    """
+    False jika jatah refresh background hari ini sudah habis
+    """
+    day = today_str()
+    if REFRESH_BUDGET["day"] != day:
+        REFRESH_BUDGET.update(day=day, used=0)
+        cutoff = time.time() - 86400
+        for fid, at in list(REFRESH_DEMAND.items()):
+            if at < cutoff:
+                REFRESH_DEMAND.pop(fid, None)
+
+    if API_REFRESH_PER_DAY and REFRESH_BUDGET["used"] >= API_REFRESH_PER_DAY:
+        return False
+    REFRESH_BUDGET["used"] += 1
+    metrics.gauge("prediction.refresh_budget_used", REFRESH_BUDGET["used"])
+    return True
+
+
+async def prediction_refresh_loop():
+    """
+    Refresh prediksi ter-cache sebelum kadaluarsa, maksimal
+    API_REFRESH_PER_MINUTE request per menit dengan jarak merata dan
+    API_REFRESH_PER_DAY per hari. Fixture yang tidak diminta user dalam
+    REFRESH_IDLE_HOURS dibiarkan kadaluarsa: request berikutnya menyajikan
+    data stale & menjadwalkan refresh lagi.
+    """
+    async def on_due(fid):
+        fixture = REFRESH_FIXTURES.pop(fid, None)
+        if fixture is None:
+            return
+        if datetime.fromisoformat(fixture["kickoff"]) <= datetime.now(WITA):
+            REFRESH_DEMAND.pop(fid, None)
+            return
+
+        if time.time() - REFRESH_DEMAND.get(fid, 0) > REFRESH_IDLE_HOURS * 3600:
+            metrics.incr("prediction.refresh_idle")
+            return
+
+        if API_BREAKER.is_open():
+            schedule_refresh(
+                fixture,
+                datetime.now(WITA) + timedelta(seconds=API_BREAKER.reset_timeout)
+            )
+            return
+
+        if not take_refresh_budget():
+            metrics.incr("prediction.refresh_budget_exhausted")
+            return
+
+        REFRESHING.add(fid)
+        try:
+            await REFRESH_LIMITER.acquire()
+            await asyncio.to_thread(fetch_prediction, fixture)
+            metrics.incr("prediction.scheduled_refresh")
+        except Exception as e:
+            logger.warning(f"Refresh terjadwal {fid} gagal: {e!r}")
+            schedule_refresh(fixture, datetime.now(WITA) + timedelta(minutes=5))
+        finally:
+            REFRESHING.discard(fid)
+
+        metrics.gauge("prediction.refresh_queue", len(REFRESH_QUEUE))
+
+    await REFRESH_QUEUE.run(on_due)
+
+
+def schedule_prediction_refresh(fixture):
+    """
+    Cache stale → refresh segera, lewat antrian yang sama (rate limit &
+    jatah harian). Aman dipanggil dari thread worker.
+    """
+    if fixture["fixture_id"] in REFRESHING:
+        return
+    schedule_refresh(fixture, datetime.now(WITA))
+
+
+def get_prediction(fixture, revalidate=False):
+    """
+    Stale-while-revalidate: cache kadaluarsa tetap dikembalikan (ditandai
+    "stale") sambil refresh jalan di background, sampai kickoff.
+    revalidate=True (proses tanpa refresh background, mis. batch.py): cache
+    kadaluarsa di-fetch ulang langsung; data stale hanya jika fetch gagal.
+    """
+    fid = fixture["fixture_id"]
+    REFRESH_DEMAND[fid] = time.time()
+    with span("prediction.get", fixture_id=fid) as sp:
+        expires_at, stale_until, pred = read_prediction_cache(prediction_cache_path(fid))
+        now = datetime.now(WITA)
+
+        if expires_at and now < datetime.fromisoformat(expires_at):
+            sp["cache"] = "hit"
+            return pred
+
+        if stale_until and now < datetime.fromisoformat(stale_until):
+            if revalidate:
+                try:
+                    fresh = fetch_prediction(fixture)
+                    if fresh:
+                        sp["cache"] = "revalidated"
+                        return fresh
+                except Exception as e:
+                    logger.warning(f"Revalidasi prediksi {fid} gagal: {e!r}")
+
+            sp["cache"] = "stale"
+            pred["stale"] = True
+            metrics.incr("prediction.stale_served")
+            schedule_prediction_refresh(fixture)
+            return pred
+
+        sp["cache"] = "miss"
+        return fetch_prediction(fixture)
+
+# ================= ODDS =================
+ODDS_DAYS = {}       # "YYYY-MM-DD" -> {"expires_at", "odds": {fixture_id: record}}
+_ODDS_LOCK = threading.Lock()
+_ODDS_DAY_LOCKS = defaultdict(threading.Lock)
+
+
+def fetch_odds(day: str):
+    """
+    Semua odds satu tanggal lewat /odds?date=... (ber-halaman),
+    bukan satu request per fixture
+    """
+    odds = {}
+    page, total = 1, 1
+    while page <= min(total, ODDS_MAX_PAGES):
+        r = safe_get(
+            f"{API_URL}/odds",
+            headers=HEADERS,
+            params={
+                "date": day,
+                "timezone": TIMEZONE,
+                "bookmaker": ODDS_BOOKMAKER,
+                "page": page,
+            },
+            timeout=15
+        )
+        body = r.json()
+        metrics.incr("odds.requests")
+        # kuota / rate limit: response kosong + "errors" → jangan di-cache
+        # sebagai hari tanpa odds
+        if body.get("errors"):
+            raise RuntimeError(f"api-sports odds error: {body['errors']}")
+
+        for item in body.get("response", []):
+            if item.get("league", {}).get("id") not in ALLOWED_LEAGUES:
+                continue
+            rec = parse_odds_item(item)
+            if rec:
+                odds[str(rec["fixture_id"])] = rec
+
+        total = body.get("paging", {}).get("total") or 1
+        page += 1
+
+    metrics.observe("odds.fixtures", len(odds))
+    return odds
+
+
+def _odds_expires_at(day: str, now):
+    # aturan TTL sama dengan prediksi, dihitung dari kickoff terdekat hari itu
+    kickoffs = [
+        datetime.fromisoformat(f["kickoff"])
+        for f in load_fixture_day(day)["fixtures"]
+    ]
+    upcoming = [k for k in kickoffs if k > now]
+    if not upcoming:
+        return datetime.fromtimestamp(fixture_day_expiry(day), WITA)
+
+    expires_at, _ = refresh_policy.plan_refresh(
+        now, min(upcoming), PREDICTION_TTL_POLICY
+    )
+    return expires_at
+
+
+def load_odds_day(day: str):
+    """
+    Odds satu tanggal: memori → file cache → API.
+    Cache kadaluarsa tetap dipakai (stale) selama breaker api-sports terbuka.
+    """
     now = datetime.now(WITA)
 
-    results = []
+    def cached():
+        with _ODDS_LOCK:
+            entry = ODDS_DAYS.get(day)
+            if entry is None:
+                entry = cache_io.read_json(odds_cache_path(day))
+                if entry is not None:
+                    ODDS_DAYS[day] = entry
+            return entry
+
+    def usable(entry):
+        return entry is not None and (
+            now < datetime.fromisoformat(entry["expires_at"])
+            or API_BREAKER.is_open()
+        )
 
-    for f in fixtures:
-        if datetime.fromisoformat(f["kickoff"]) < now:
-            continue
+    entry = cached()
+    if usable(entry):
+        return entry
+
+    # satu fetch per tanggal; worker lain menunggu hasilnya tanpa
+    # menahan tanggal lain
+    with _ODDS_DAY_LOCKS[day]:
+        entry = cached()
+        if usable(entry):
+            return entry
+
+        try:
+            odds = fetch_odds(day)
+        except Exception:
+            if entry is not None:
+                metrics.incr("odds.stale_served")
+                return entry
+            raise
+
+        entry = {
+            "expires_at": _odds_expires_at(day, now).isoformat(),
+            "odds": odds,
+        }
+        path = odds_cache_path(day)
+        cache_io.write_json(path, entry)
+        CACHE_EXPIRY.schedule(path, fixture_day_expiry(day))
+        with _ODDS_LOCK:
+            ODDS_DAYS[day] = entry
+        return entry
+
+
+def get_odds(fixture):
+    """
+    Record odds fixture (lihat odds.parse_odds_item) atau None
+    """
+    day = fixture["kickoff"][:10]
+    return load_odds_day(day)["odds"].get(str(fixture["fixture_id"]))
+
+
+# ================= TEAM STATS =================
+# Dipakai hanya jika /predictions tidak membawa rata-rata gol kandang/tandang.
+# Satu tim (mis. liga domestik + UEFA) di-fetch sekali per liga & season,
+# lalu dipakai semua fixture yang melibatkan tim tsb.
+TEAM_STATS_FILE = os.path.join(CACHE_DIR, "team_stats.json")
+TEAM_STATS = {}     # "team:league:season" -> {"fetched_at", "stats"}
+_TEAM_STATS_LOCK = threading.Lock()
+_TEAM_STATS_KEY_LOCKS = defaultdict(threading.Lock)
+
+
+def _load_team_stats():
+    if TEAM_STATS:
+        return
+    TEAM_STATS.update(cache_io.read_json(TEAM_STATS_FILE, {}))
 
-        pred = get_prediction(f)
-        if not pred:
+
+def _team_stats_fresh(entry, now):
+    age = now - datetime.fromisoformat(entry["fetched_at"])
+    return age < timedelta(hours=TEAM_STATS_TTL_HOURS)
+
+
+def fetch_team_stats(team_id, league_id, season):
+    r = safe_get(
+        f"{API_URL}/teams/statistics",
+        headers=HEADERS,
+        params={"team": team_id, "league": league_id, "season": season},
+        timeout=15
+    )
+    metrics.incr("team_stats.requests")
+    body = r.json()
+    data = body.get("response")
+    # error / response kosong tidak di-cache: statistik None menutupi retry
+    # selama TEAM_STATS_TTL_HOURS
+    if body.get("errors") or not data or not isinstance(data, dict):
+        raise RuntimeError(
+            f"api-sports team stats {team_id} kosong: {body.get('errors')}"
+        )
+
+    # hanya rata-rata gol per venue, bentuk sama dengan teams.*.league.goals
+    goals = data.get("goals", {})
+    return {
+        "goals": {
+            kind: {
+                "average": {
+                    venue: goals.get(kind, {}).get("average", {}).get(venue)
+                    for venue in ("home", "away")
+                }
+            }
+            for kind in ("for", "against")
+        }
+    }
+
+
+def get_team_stats(team_id, league_id, season):
+    key = f"{team_id}:{league_id}:{season}"
+    now = datetime.now(WITA)
+
+    with _TEAM_STATS_LOCK:
+        _load_team_stats()
+        entry = TEAM_STATS.get(key)
+        if entry and _team_stats_fresh(entry, now):
+            metrics.incr("team_stats.hit")
+            return entry["stats"]
+        key_lock = _TEAM_STATS_KEY_LOCKS[key]
+
+    # satu fetch per tim walau beberapa fixture meminta bersamaan
+    with key_lock:
+        with _TEAM_STATS_LOCK:
+            entry = TEAM_STATS.get(key)
+            if entry and _team_stats_fresh(entry, now):
+                return entry["stats"]
+
+        try:
+            stats = fetch_team_stats(team_id, league_id, season)
+        except Exception:
+            if entry:   # data lama lebih baik dari last_5
+                return entry["stats"]
+            raise
+
+        with _TEAM_STATS_LOCK:
+            TEAM_STATS[key] = {"fetched_at": now.isoformat(), "stats": stats}
+            for k in [k for k, e in TEAM_STATS.items() if not _team_stats_fresh(e, now)]:
+                TEAM_STATS.pop(k)
+                _TEAM_STATS_KEY_LOCKS.pop(k, None)
+            snapshot = dict(TEAM_STATS)
+        cache_io.write_json(TEAM_STATS_FILE, snapshot)
+        return stats
+
+
+def attach_team_stats(pred):
+    league = pred.get("league", {})
+    if not league.get("id") or not league.get("season"):
+        return
+
+    for side, venue in (("home", "home"), ("away", "away")):
+        team = pred.get("teams", {}).get(side, {})
+        if not team.get("id"):
             continue
+        # /predictions sudah lengkap → tidak perlu request tambahan
+        if venue_average(team, "for", venue) is not None:
+            continue
+        team["season_stats"] = get_team_stats(team["id"], league["id"], league["season"])
+
 
-        results.append((f, pred))
+def load_prediction(fixture, revalidate=False):
+    """
+    Prediksi + pelengkap (statistik tim, odds). Pelengkap yang gagal
+    diabaikan, prediksi tetap jalan. revalidate: lihat get_prediction.
+    """
+    pred = get_prediction(fixture, revalidate)
+    if not pred:
+        return pred
+
+    try:
+        with span("team_stats.attach", fixture_id=fixture["fixture_id"]):
+            attach_team_stats(pred)
+    except Exception as e:
+        logger.warning(f"Gagal ambil statistik tim {fixture['fixture_id']}: {e!r}")
+
+    if ODDS_ENABLED:
+        try:
+            with span("odds.get", fixture_id=fixture["fixture_id"]):
+                pred["odds"] = get_odds(fixture)
+        except Exception as e:
+            logger.warning(f"Gagal ambil odds {fixture['fixture_id']}: {e!r}")
+    return pred
+
+# ================= FIXTURE INDEX =================
+FIXTURE_INDEX = {"key": None, "index": None}
+
+
+async def fixture_index() -> FixtureIndex:
+    """
+    Index fixture dalam horizon, dibangun ulang hanya jika ada perubahan.
+    Tanggal yang belum ada di memori dimuat (disk / API) di thread worker.
+    """
+    days = horizon_dates()
+    missing = [d for d in days if d not in FIXTURE_DAYS]
+    if missing:
+        # memuat tanggal baru menaikkan FIXTURE_STATE["version"]
+        await asyncio.to_thread(lambda: [load_fixture_day(d) for d in missing])
+
+    # cek key dulu: daftar fixture hanya dirangkai saat index dibangun ulang
+    key = (tuple(days), FIXTURE_STATE["version"])
+    if FIXTURE_INDEX["key"] != key:
+        fixtures = [f for d in days for f in FIXTURE_DAYS[d]["fixtures"]]
+        FIXTURE_INDEX["index"] = FixtureIndex(fixtures)
+        FIXTURE_INDEX["key"] = key
+    return FIXTURE_INDEX["index"]
+
+
+def parse_prediksi_args(args):
+    """
+    Argumen: alias liga, hariini/besok, angka = jendela kickoff (jam),
+    p2/p3/... = halaman
+    """
+    flt = {"leagues": set(), "date": None, "hours": None, "page": 1}
+    unknown = []
+
+    for raw in args:
+        a = raw.lower()
+        if a in LEAGUE_ALIASES:
+            flt["leagues"].add(LEAGUE_ALIASES[a])
+        elif a in ("hariini", "today"):
+            flt["date"] = _date_str(0)
+        elif a in ("besok", "tomorrow"):
+            flt["date"] = _date_str(1)
+        elif a.isdigit():
+            flt["hours"] = max(1, int(a))
+        elif a[:1] == "p" and a[1:].isdigit():
+            flt["page"] = max(1, int(a[1:]))
+        else:
+            unknown.append(raw)
+
+    return flt, unknown
+
+
+async def select_fixtures(flt):
+    now = datetime.now(WITA)
+    until = now + timedelta(hours=flt["hours"]) if flt["hours"] else None
+
+    with span("fixtures.select") as sp:
+        idx = await fixture_index()
+        fixtures = idx.upcoming(
+            now, until=until, leagues=flt["leagues"], day=flt["date"]
+        )
+        sp["count"] = len(fixtures)
+    return fixtures
+
+
+async def stream_predictions(fixtures, deadline=None, pending=None):
+    """
+    Fetch prediksi secara paralel (dibatasi PREDICTION_CONCURRENCY) dan
+    yield (fixture, pred) berurutan kickoff begitu masing-masing siap.
+
+    deadline (loop.time()): setelah lewat, tidak menunggu lagi — hanya
+    prediksi yang sudah siap yang di-yield, sisanya masuk `pending`.
+    """
+    loop = asyncio.get_running_loop()
+    sem = asyncio.Semaphore(PREDICTION_CONCURRENCY)
+
+    async def fetch(f):
+        async with sem:
+            return await asyncio.to_thread(load_prediction, f)
+
+    tasks = [asyncio.create_task(fetch(f)) for f in fixtures]
+    try:
+        for f, task in zip(fixtures, tasks):
+            if deadline is None:
+                await asyncio.wait({task})
+            elif not task.done():
+                remaining = deadline - loop.time()
+                if remaining > 0:
+                    await asyncio.wait({task}, timeout=remaining)
+
+            if not task.done():
+                if pending is not None:
+                    pending.append(f)
+                continue
+
+            if task.exception() is not None:
+                if deadline is None:
+                    raise task.exception()
+                logger.warning(
+                    f"Gagal fetch prediksi {f['fixture_id']}: {task.exception()!r}"
+                )
+                if pending is not None:
+                    pending.append(f)
+                continue
+
+            pred = task.result()
+            if pred:
+                yield f, pred
+    finally:
+        for t in tasks:
+            t.cancel()
+
+# ================= ANALYSIS =================
+ANALYSES = {}            # fixture_id -> hasil analyze()
+RANKING = RankedIndex()  # pick terbaik, di-update tiap analyze()
+
+
+def analyze(fixture, pred):
+    analysis = analyze_prediction(fixture, pred)
+
+    fid = fixture["fixture_id"]
+    ANALYSES[fid] = analysis
+    RANKING.update(
+        fid, analysis,
+        analysis["hdp_info"]["score"], analysis["winner_conf"], analysis["sync"]
+    )
+    return analysis
+
+
+def format_analysis(a):
+    with span("format", fixture_id=a["fixture"]["fixture_id"]):
+        return telegram_formatter_full(
+            fixture=a["fixture"],
+            home_scores=a["home_scores"],
+            away_scores=a["away_scores"],
+            decision=a["decision"],
+            hdp=a["hdp"],
+            hdp_info=a["hdp_info"],
+            sync=a["sync"],
+            stale=a["stale"],
+            value=a["value"],
+        )
+
+
+def prune_analyses(now):
+    for fid, a in list(ANALYSES.items()):
+        if datetime.fromisoformat(a["fixture"]["kickoff"]) < now:
+            ANALYSES.pop(fid, None)
+            RANKING.discard(fid)
+            if LIVE_MODE:
+                remember_live_xg(fid, a)
+
+
+async def analysis_prune_loop():
+    """
+    Buang analisa yang sudah kickoff secara berkala, supaya ANALYSES &
+    RANKING tidak tumbuh walau /top jarang dipanggil
+    """
+    while True:
+        await asyncio.sleep(ANALYSIS_PRUNE_SECONDS)
+        prune_analyses(datetime.now(WITA))
+        metrics.gauge("analysis.cached", len(ANALYSES))
+
+
+# ================= TUNING =================
+TUNING_STATE = {"mtime": None}
+
+
+def _tuning_mtime():
+    try:
+        return os.path.getmtime(TUNING_FILE)
+    except FileNotFoundError:
+        return None
+
+
+async def reload_tuning(force=False):
+    """
+    Baca ulang TUNING_FILE jika berubah (atau force).
+    → versi config baru, None jika tidak berubah.
+    ValueError jika file tidak valid; config lama tetap aktif.
+    """
+    mtime = _tuning_mtime()
+    if not force and mtime == TUNING_STATE["mtime"]:
+        return None
+    # dicatat dulu: file rusak tidak dicoba ulang tiap cek sampai diubah lagi
+    TUNING_STATE["mtime"] = mtime
+
+    try:
+        cfg = await cache_io.run(tuning.load_file, TUNING_FILE, EXTRACTORS)
+    except ValueError:
+        metrics.incr("tuning.reload_failed")
+        raise
+
+    # apply + invalidasi di event loop, tidak bisa menyela analyze()
+    version = tuning.apply(cfg)
+    ANALYSES.clear()
+    RANKING.clear()
+
+    metrics.incr("tuning.reloaded")
+    metrics.gauge("tuning.version", version)
+    logger.info(f"Tuning v{version} aktif, analisa lama dibuang")
+    return version
+
+
+async def tuning_watch_loop():
+    while True:
+        try:
+            await reload_tuning()
+        except ValueError as e:
+            logger.error(f"File tuning ditolak: {e}")
+        except Exception:
+            logger.exception("Gagal membaca file tuning")
+        await asyncio.sleep(TUNING_CHECK_SECONDS)
+
+
+def tuning_summary():
+    cfg = tuning.current()
+    hdp = cfg["hdp"]
+    lines = [f"⚙️ *TUNING v{tuning.version()}*", "```"]
+    for f in cfg["factors"]:
+        lines.append(f"{f['name']:<16}{f['weight']:>6} {f['extractor']}")
+    lines.append(f"{'home_bias':<16}{cfg['home_bias']:>6}")
+    lines.append(f"{'value_edge_min':<16}{cfg['value_edge_min']:>6}")
+    lines.append(f"{'hdp.target':<16}{hdp['target_cover']:>6}")
+    lines.append(f"{'hdp.risk':<16}{hdp['risk_aversion']:>6}")
+    lines.append(f"{'hdp.xg':<16}{hdp['xg_min']}–{hdp['xg_max']}")
+    lines.append("```")
+    return "\n".join(lines)
 
-    return results
 
 def hdp_confidence_label(score: float):
     if score >= 75:
@@ -272,9 +1274,438 @@ def hdp_confidence_label(score: float):
     else:
         return "🔴 Hindari"
 
+# ================= LIVE =================
+# Satu request per poll berapa pun jumlah pelanggan; hanya gol & perubahan
+# status yang dikirim.
+LIVE_STATE = {"snapshot": None, "missing": {}}
+LIVE_XG = {}     # fixture_id -> (home_xg, away_xg) pra-laga
+LIVE_STATUS_TEXT = {
+    "1H": "⏱ Kick-off",
+    "HT": "☕ Half time",
+    "2H": "⏱ Babak kedua",
+    "ET": "⏱ Extra time",
+    "P": "🎯 Adu penalti",
+    "SUSP": "⚠️ Dihentikan sementara",
+    "INT": "⚠️ Dihentikan sementara",
+    "FT": "🏁 Full time",
+}
+
+
+def remember_live_xg(fid, analysis):
+    hdp = analysis["hdp"]
+    if hdp.get("engine_quality") != "fallback" and hdp.get("home_xg"):
+        LIVE_XG[fid] = (hdp["home_xg"], hdp["away_xg"])
+
+
+def fetch_live():
+    r = safe_get(
+        f"{API_URL}/fixtures",
+        headers=HEADERS,
+        # filter liga di sisi server: payload kecil, tetap 1 request
+        params={"live": "-".join(str(lid) for lid in sorted(ALLOWED_LEAGUES))},
+        timeout=15
+    )
+    metrics.incr("live.polls")
+    body = r.json()
+    # kuota / rate limit: HTTP 200, response kosong, alasan di "errors".
+    # Dianggap poll gagal, bukan "semua pertandingan selesai".
+    if body.get("errors"):
+        raise RuntimeError(f"api-sports live error: {body['errors']}")
+    return {
+        m["fixture_id"]: m
+        for m in map(slim_live, body["response"])
+        if m["league_id"] in ALLOWED_LEAGUES
+    }
+
+
+def live_event_text(event):
+    m = event["match"]
+    score = f"{m['home']} *{m['goals_home']}-{m['goals_away']}* {m['away']}"
+
+    if event["type"] == "goal":
+        head = f"⚽ GOL! ({m['elapsed']}')"
+    else:
+        head = LIVE_STATUS_TEXT.get(m["status"], f"ℹ️ {m['status']}")
+
+    lines = [head, score, f"_{m['league_name']}_"]
+
+    xg = LIVE_XG.get(m["fixture_id"])
+    if xg and m["status"] != "FT":
+        p = inplay_probs(xg[0], xg[1], m["elapsed"], m["goals_home"], m["goals_away"])
+        lines.append(
+            f"Peluang akhir: Home *{p['home'] * 100:.0f}%* | "
+            f"Draw *{p['draw'] * 100:.0f}%* | Away *{p['away'] * 100:.0f}%*"
+        )
+    return "\n".join(lines)
+
+
+def live_subscribers(users, league_id):
+    return [
+        cid for cid, u in users.items()
+        if u.get("live") and (not u.get("leagues") or league_id in u["leagues"])
+    ]
+
+
+async def live_poll_loop(app):
+    while True:
+        try:
+            if not API_BREAKER.is_open():
+                curr = await asyncio.to_thread(fetch_live)
+                prev = LIVE_STATE["snapshot"]
+                LIVE_STATE["snapshot"] = curr
+                metrics.gauge("live.matches", len(curr))
+
+                for fid in curr:
+                    if fid not in LIVE_XG and fid in ANALYSES:
+                        remember_live_xg(fid, ANALYSES[fid])
+
+                # poll pertama setelah start hanya jadi baseline
+                missing = LIVE_STATE["missing"]
+                events = (
+                    diff_snapshots(prev, curr, missing, LIVE_FT_GRACE_POLLS)
+                    if prev is not None else []
+                )
+                if events:
+                    await push_live_events(app, events)
+
+                for fid in set(LIVE_XG) - set(curr) - set(missing):
+                    LIVE_XG.pop(fid, None)
+
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Live poll gagal")
+
+        await asyncio.sleep(LIVE_POLL_SECONDS)
+
+
+async def push_live_events(app, events):
+    users = await load_users()
+    for event in events:
+        metrics.incr("live.events")
+        text = live_event_text(event)
+        for cid in live_subscribers(users, event["match"]["league_id"]):
+            try:
+                await app.bot.send_message(int(cid), text, parse_mode="Markdown")
+                metrics.incr("live.sent")
+            except Exception as e:
+                logger.warning(f"Kirim live ke {cid} gagal: {e!r}")
+            await asyncio.sleep(0.05)  # anti flood
+
+# ================= BROADCAST =================
+# Slate harian dihitung & dirender sekali, lalu dikirim ke semua pelanggan
+# lewat antrian ber-rate-limit. Teks & daftar penerima (tetap sejak build)
+# disimpan ke broadcast_{tanggal}.json, posisi penerima berikutnya ke
+# broadcast_{tanggal}.cursor, supaya restart melanjutkan, bukan mengirim ulang.
+BROADCAST_LIMITER = RateLimiter(BROADCAST_PER_MINUTE)
+
+
+def next_broadcast_time(now):
+    hh, mm = map(int, BROADCAST_AT.split(":"))
+    at = now.replace(hour=hh, minute=mm, second=0, microsecond=0)
+    return at if at > now else at + timedelta(days=1)
+
+
+async def build_broadcast(day):
+    users = await load_users()
+    picks = await top_picks(BROADCAST_TOP, day=day, timeout=BROADCAST_BUILD_SECONDS)
+    text = (
+        render_top(picks, title=f"📬 *PICK HARI INI ({day})*")
+        if picks else "📬 Hari ini tidak ada pick yang layak."
+    )
+    return {
+        "date": day,
+        "text": text,
+        "recipients": [cid for cid, u in users.items() if u.get("broadcast")],
+        "done": False,
+    }
+
+
+async def _send_broadcast_chunk(app, cid, chunk):
+    for _ in range(2):
+        await BROADCAST_LIMITER.acquire()
+        try:
+            await app.bot.send_message(int(cid), chunk, parse_mode="Markdown")
+            return
+        except RetryAfter as e:
+            await asyncio.sleep(e.retry_after)
+    raise RuntimeError(f"flood control untuk {cid}")
+
+
+async def run_broadcast(app, day):
+    path = broadcast_progress_path(day)
+    progress = await cache_io.aread_json(path)
+    if progress and progress.get("done"):
+        return
+    cursor_path = broadcast_cursor_path(day)
+    if not progress:
+        progress = await build_broadcast(day)
+        await cache_io.run(cache_io.remove, cursor_path)
+        await cache_io.awrite_json(path, progress)
+        CACHE_EXPIRY.schedule(path, fixture_day_expiry(day))
+        CACHE_EXPIRY.schedule(cursor_path, fixture_day_expiry(day))
+
+    started = time.perf_counter()
+    chunks = list(split_message(progress["text"]))
+    recipients = progress["recipients"]
+    cursor = int(await cache_io.run(cache_io.read_bytes, cursor_path) or 0)
+
+    for i in range(cursor, len(recipients)):
+        cid = recipients[i]
+        try:
+            for chunk in chunks:
+                await _send_broadcast_chunk(app, cid, chunk)
+            metrics.incr("broadcast.sent")
+        except Forbidden:
+            metrics.incr("broadcast.blocked")   # user memblokir bot
+        except Exception as e:
+            metrics.incr("broadcast.failed")
+            logger.warning(f"Broadcast ke {cid} gagal: {e!r}")
+
+        # dicatat walau gagal: tidak dicoba ulang setelah restart.
+        # Disimpan tiap penerima (beberapa byte) supaya restart tidak
+        # mengirim dobel.
+        await cache_io.run(cache_io.write_atomic, cursor_path, str(i + 1).encode())
+
+    progress["done"] = True
+    await cache_io.awrite_json(path, progress)
+    metrics.observe("broadcast.duration_s", time.perf_counter() - started)
+    logger.info(f"Broadcast {day} selesai ke {len(progress['recipients'])} chat")
+
+
+async def broadcast_day(app, day):
+    """
+    Broadcast `day`; gagal → coba ulang tiap BROADCAST_RETRY_MINUTES
+    selama tanggalnya belum lewat
+    """
+    while today_str() == day:
+        try:
+            await run_broadcast(app, day)
+            return
+        except Exception:
+            metrics.incr("broadcast.retry")
+            logger.exception(f"Broadcast {day} gagal, dicoba ulang")
+        await asyncio.sleep(BROADCAST_RETRY_MINUTES * 60)
+
+
+async def broadcast_loop(app):
+    # restart setelah jam broadcast: lanjutkan progres hari ini jika ada
+    today = today_str()
+    if os.path.exists(broadcast_progress_path(today)):
+        await broadcast_day(app, today)
+
+    while True:
+        now = datetime.now(WITA)
+        at = next_broadcast_time(now)
+        await asyncio.sleep((at - now).total_seconds())
+        await broadcast_day(app, at.strftime("%Y-%m-%d"))
+
+# ================= HTTP API =================
+# Hanya membaca state di memori (FIXTURE_DAYS, ANALYSES, RANKING):
+# polling konsumen tidak pernah memicu hitung ulang atau request upstream.
+HTTP_API = JsonApi()
+
+
+def memory_fixture_index():
+    """
+    FixtureIndex dari tanggal yang sudah ada di memori saja (tanpa disk / API)
+    """
+    days = [d for d in horizon_dates() if d in FIXTURE_DAYS]
+    key = (tuple(days), FIXTURE_STATE["version"])
+    if FIXTURE_INDEX["key"] != key:
+        fixtures = [f for d in days for f in FIXTURE_DAYS[d]["fixtures"]]
+        FIXTURE_INDEX["index"] = FixtureIndex(fixtures)
+        FIXTURE_INDEX["key"] = key
+    return FIXTURE_INDEX["index"]
+
+
+def api_fixtures(params, _):
+    leagues = {int(x) for x in params.get("league", "").split(",") if x.isdigit()}
+    fixtures = memory_fixture_index().upcoming(
+        datetime.now(WITA), leagues=leagues, day=params.get("date")
+    )
+    return 200, {
+        "count": len(fixtures),
+        "fixtures": [
+            dict(f, analyzed=f["fixture_id"] in ANALYSES) for f in fixtures
+        ],
+    }
+
+
+def api_analysis(_, tail):
+    if not tail.isdigit():
+        return 400, {"error": "fixture_id harus angka"}
+    analysis = ANALYSES.get(int(tail))
+    if analysis is None:
+        return 404, {"error": "belum dianalisa"}
+    return 200, analysis
+
+
+def api_slate(params, _):
+    n = params.get("n", "")
+    n = max(1, min(int(n), HTTP_API_SLATE_MAX)) if n.isdigit() else TOP_MAX
+    now = datetime.now(WITA)
+
+    picks = RANKING.top(
+        n, keep=lambda a: datetime.fromisoformat(a["fixture"]["kickoff"]) >= now
+    )
+    return 200, {
+        "count": len(picks),
+        "picks": [
+            {
+                "fixture": a["fixture"],
+                "pick": a["decision"]["pick"],
+                "winner_conf": a["winner_conf"],
+                "best_side": a["hdp_info"]["best_side"],
+                "best_hdp": a["hdp"].get("best_hdp"),
+                "hdp_conf": a["hdp_info"]["score"],
+                "sync": a["sync"],
+                "value_edge": ((a["value"] or {}).get("best_hdp") or {}).get("edge"),
+                "stale": a["stale"],
+            }
+            for a in picks
+        ],
+    }
+
+
+def api_health(_, __):
+    return 200, {"status": "ok"}
+
+
+def api_ready(_, __):
+    days = horizon_dates()
+    now = datetime.now(WITA)
+    upcoming = memory_fixture_index().upcoming(now)
+    analyzed = sum(1 for f in upcoming if f["fixture_id"] in ANALYSES)
+
+    warmth = {
+        "fixture_days": {d: d in FIXTURE_DAYS for d in days},
+        "fixtures_upcoming": len(upcoming),
+        "analyses": len(ANALYSES),
+        "analyzed_ratio": round(analyzed / len(upcoming), 3) if upcoming else None,
+        "ranked": len(RANKING),
+        "api_breaker": API_BREAKER.state,
+    }
+    ready = all(warmth["fixture_days"].values())
+    return (200 if ready else 503), {"ready": ready, "cache": warmth}
+
+
+HTTP_API.route("/health", api_health)
+HTTP_API.route("/ready", api_ready)
+HTTP_API.route("/fixtures", api_fixtures)
+HTTP_API.route("/slate", api_slate)
+HTTP_API.route("/analysis/", api_analysis, prefix=True)
+
+# ================= PROFILE =================
+def prediction_cycle(flt):
+    """
+    Satu siklus /prediksi versi sinkron (fixture → prediksi → engine →
+    format, tanpa kirim) supaya seluruhnya terekam profiler di satu thread
+    """
+    now = datetime.now(WITA)
+    until = now + timedelta(hours=flt["hours"]) if flt["hours"] else None
+    fixtures = FixtureIndex(get_fixtures()).upcoming(
+        now, until=until, leagues=flt["leagues"], day=flt["date"]
+    )
+    offset = (flt["page"] - 1) * PREDIKSI_PAGE_SIZE
+
+    done = 0
+    for f in fixtures[offset:offset + PREDIKSI_PAGE_SIZE]:
+        pred = load_prediction(f)
+        if pred:
+            format_analysis(analyze_prediction(f, pred))
+            done += 1
+    return done
+
+
+async def profile_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    /profile [argumen /prediksi]  → profil cProfile satu siklus prediksi
+    /profile sample [detik]       → sampling seluruh proses
+    """
+    if update.effective_user.id not in ADMIN_IDS:
+        return
+
+    args = list(context.args)
+    stamp = datetime.now(WITA).strftime("%Y%m%d_%H%M%S")
+
+    try:
+        if args[:1] == ["sample"]:
+            seconds = int(args[1]) if len(args) > 1 and args[1].isdigit() else 10
+            seconds = max(1, min(seconds, PROFILE_SAMPLE_MAX_SECONDS))
+            path = os.path.join(CACHE_DIR, f"profile_{stamp}.folded")
+
+            await update.message.reply_text(f"⏱ Sampling {seconds} detik...")
+            text = await asyncio.to_thread(profiler.sample, seconds, path)
+            title = f"🔬 *SAMPLE {seconds}s*"
+        else:
+            flt, unknown = parse_prediksi_args(args)
+            if unknown:
+                await update.message.reply_text(
+                    f"❌ Argumen tidak dikenal: {', '.join(unknown)}"
+                )
+                return
+            path = os.path.join(CACHE_DIR, f"profile_{stamp}.prof")
+
+            done, text = await asyncio.to_thread(
+                profiler.profile_call, prediction_cycle, path, flt
+            )
+            title = f"🔬 *PROFILE /prediksi* ({done} fixture)"
+
+        CACHE_EXPIRY.schedule(path, time.time() + PROFILE_KEEP_DAYS * 86400)
+        await send_long_message(
+            update,
+            f"{title}\n{text}\nFile: `{os.path.basename(path)}`",
+            parse_mode="Markdown"
+        )
+
+    except Exception:
+        logger.exception("Error saat profile")
+        await update.message.reply_text("⚠️ Profiling gagal.")
+
+# ================= THROTTLE =================
+CHAT_THROTTLE = ChatThrottle(COMMAND_THROTTLE_SECONDS)
+
+
+async def throttled(update, command, args) -> bool:
+    """
+    True jika perintah ditahan (sudah dibalas di sini): perintah sama yang
+    jawabannya masih ada dirujuk lewat reply, selain itu ditolak singkat.
+    Argumen berbeda (mis. `p2`, filter lain) tidak ditahan.
+    """
+    chat_id = update.effective_chat.id
+    args = [a.lower() for a in args]
+    prev = CHAT_THROTTLE.begin(chat_id, command, args)
+    if prev is None:
+        return False
+
+    metrics.incr(f"throttle.{command}")
+
+    if not prev["running"] and prev["message_id"]:
+        try:
+            await update.message.reply_text(
+                "↩️ Jawaban terbaru masih sama, lihat di sini.",
+                reply_to_message_id=prev["message_id"],
+            )
+            metrics.incr("throttle.reused")
+            return True
+        except Exception:
+            pass    # pesan lama sudah dihapus → tolak biasa
+
+    metrics.incr("throttle.refused")
+    if prev["running"]:
+        text = f"⏳ /{command} sebelumnya masih diproses."
+    else:
+        text = (
+            f"⏳ Tunggu {CHAT_THROTTLE.retry_in(prev)} detik "
+            f"sebelum /{command} lagi."
+        )
+    await update.message.reply_text(text)
+    return True
+
 # ================= HANDLERS =================
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    users = load_users()
+    users = await load_users()
     cid = str(update.effective_chat.id)
     user = update.effective_user
 
@@ -287,7 +1718,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
             "first_seen": datetime.now(WITA).isoformat(),
             "nickname": None
         }
-        save_users(users)
+        await save_users(users)
 
         await update.message.reply_text(
             "👋 Halo!\n*Sebelum mulai, boleh minta ente pe nama?*",
@@ -297,7 +1728,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     await update.message.reply_text(
         "🤖 Welcome kembali!\n"
-        "Gunakan /prediksi atau /jadwal\n\n"
+        + USAGE_TEXT
         + SUPPORTED_LEAGUES_TEXT,
         parse_mode="Markdown"
     )
@@ -311,55 +1742,153 @@ async def nickname_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("Boleh dpe nama yang singkat jo 🙂")
         return
 
-    users = load_users()
+    users = await load_users()
     cid = str(update.effective_chat.id)
 
     if cid in users:
         users[cid]["nickname"] = nickname
-        save_users(users)
+        await save_users(users)
 
     context.user_data.pop("awaiting_nickname", None)
 
     await update.message.reply_text(
         f"✅ Sip, WELCOME *{nickname}* si penjudi!\n\n"
-        "Gunakan /prediksi atau /jadwal\n\n"
+        + USAGE_TEXT
         + SUPPORTED_LEAGUES_TEXT,
         parse_mode="Markdown"
     )
 
+async def liga(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    users = await load_users()
+    cid = str(update.effective_chat.id)
+    args = [a.lower() for a in context.args]
+
+    if cid not in users:
+        await update.message.reply_text("Ketik /start dulu 🙂")
+        return
+
+    if not args:
+        saved = users[cid].get("leagues") or []
+        names = [a for a, lid in LEAGUE_ALIASES.items() if lid in saved]
+        await update.message.reply_text(
+            "⭐ Liga favorit: "
+            + (", ".join(names) if names else "semua liga")
+            + "\nAlias: " + ", ".join(sorted(LEAGUE_ALIASES))
+            + "\nReset: /liga semua"
+        )
+        return
+
+    if args == ["semua"]:
+        users[cid].pop("leagues", None)
+        await save_users(users)
+        await update.message.reply_text("✅ Liga favorit direset ke semua liga.")
+        return
+
+    unknown = [a for a in args if a not in LEAGUE_ALIASES]
+    if unknown:
+        await update.message.reply_text(
+            f"❌ Liga tidak dikenal: {', '.join(unknown)}"
+        )
+        return
+
+    users[cid]["leagues"] = sorted({LEAGUE_ALIASES[a] for a in args})
+    await save_users(users)
+    await update.message.reply_text(
+        f"✅ Liga favorit disimpan: {', '.join(args)}"
+    )
+
+
+async def live_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if not LIVE_MODE:
+        await update.message.reply_text("ℹ️ Live mode belum diaktifkan.")
+        return
+
+    users = await load_users()
+    cid = str(update.effective_chat.id)
+    if cid not in users:
+        await update.message.reply_text("Ketik /start dulu 🙂")
+        return
+
+    on = not users[cid].get("live")
+    users[cid]["live"] = on
+    await save_users(users)
+    await update.message.reply_text(
+        "🔴 Update live aktif: gol & status laga liga favorit akan dikirim."
+        if on else "✅ Update live dimatikan."
+    )
+
+
 async def prediksi(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if await throttled(update, "prediksi", context.args):
+        return
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    deadline = started + PREDIKSI_DEADLINE_SECONDS
+    first_id = None
+
     try:
-        results = collect_predictions()
+        flt, unknown = parse_prediksi_args(context.args)
+        if unknown:
+            await update.message.reply_text(
+                f"❌ Argumen tidak dikenal: {', '.join(unknown)}\n"
+                + USAGE_TEXT.strip(),
+                parse_mode="Markdown"
+            )
+            return
+
+        if not flt["leagues"]:
+            user = (await load_users()).get(str(update.effective_chat.id), {})
+            flt["leagues"] = set(user.get("leagues") or [])
+
+        fixtures = await asyncio.wait_for(
+            select_fixtures(flt), PREDIKSI_DEADLINE_SECONDS
+        )
+        offset = (flt["page"] - 1) * PREDIKSI_PAGE_SIZE
+        page = fixtures[offset:offset + PREDIKSI_PAGE_SIZE]
+
+        sent = 0
+        pending = []
+        async for f, pred in stream_predictions(page, deadline, pending):
+            a = analyze(f, pred)
+
+            text = format_analysis(a)
 
-        if not results:
+            with span("telegram.send", fixture_id=f["fixture_id"]):
+                msg = await update.message.reply_text(text, parse_mode="Markdown")
+            first_id = first_id or msg.message_id
+            sent += 1
+            await asyncio.sleep(0.35)  # anti flood
+
+        if pending:
+            metrics.incr("prediksi.deadline_miss")
+            metrics.observe("prediksi.pending", len(pending))
+            await update.message.reply_text(
+                "⏳ *Belum siap, coba lagi sebentar:*\n"
+                + "\n".join(
+                    f"- {f['home']} vs {f['away']} "
+                    f"({datetime.fromisoformat(f['kickoff']).strftime('%d %b %H:%M')})"
+                    for f in pending
+                ),
+                parse_mode="Markdown"
+            )
+        elif not sent:
             await update.message.reply_text("❌ Tidak ada prediksi tersedia.")
             return
 
-        for f, pred in results:
-            decision = final_decision(pred)
-            hdp = hdp_suggestion(pred)
-            hdp_info = hdp_confidence(
-                hdp_resp=hdp,
-                home_xg=hdp.get("home_xg", 0),
-                away_xg=hdp.get("away_xg", 0),
-            )
-        
-            winner_conf = extract_confidence_percent(decision["confidence"])
-            sync = sync_confidence(winner_conf, hdp_info["score"])
-        
-            text = telegram_formatter_full(
-                fixture=f,
-                home_scores=factor_scores(pred, "home"),
-                away_scores=factor_scores(pred, "away"),
-                decision=decision,
-                hdp=hdp,
-                hdp_info=hdp_info,
-                sync=sync,
+        if len(fixtures) > offset + PREDIKSI_PAGE_SIZE:
+            await update.message.reply_text(
+                f"📄 Halaman {flt['page']} dari "
+                f"{-(-len(fixtures) // PREDIKSI_PAGE_SIZE)}. "
+                f"Tambahkan `p{flt['page'] + 1}` untuk halaman berikutnya.",
+                parse_mode="Markdown"
             )
-        
-            await update.message.reply_text(text, parse_mode="Markdown")
-            await asyncio.sleep(0.35)  # anti flood
 
+    except asyncio.TimeoutError:
+        metrics.incr("prediksi.deadline_miss")
+        await update.message.reply_text(
+            "⏳ Data jadwal belum siap. Coba lagi sebentar."
+        )
 
     except Exception:
         logger.exception("Error saat prediksi")
@@ -367,11 +1896,150 @@ async def prediksi(update: Update, context: ContextTypes.DEFAULT_TYPE):
             "⚠️ Terjadi error saat memproses prediksi. Coba lagi nanti."
         )
 
+    finally:
+        CHAT_THROTTLE.finish(update.effective_chat.id, "prediksi", first_id)
+        metrics.observe("prediksi.duration_s", loop.time() - started)
+
+
+async def top_picks(n, day=None, timeout=PREDIKSI_DEADLINE_SECONDS):
+    """
+    N pick terbaik yang belum kickoff (opsional: hanya tanggal `day`).
+    Hanya fixture yang belum pernah dianalisa yang di-fetch; fixture yang
+    gagal / belum siap dalam `timeout` detik dilewati (masuk lain kali).
+    """
+    now = datetime.now(WITA)
+    prune_analyses(now)
+    deadline = asyncio.get_running_loop().time() + timeout
+
+    flt, _ = parse_prediksi_args([])
+    flt["date"] = day
+    try:
+        pending = [
+            f for f in await select_fixtures(flt)
+            if f["fixture_id"] not in ANALYSES
+        ]
+    except Exception as e:
+        # daftar fixture tidak bisa dimuat (API down / breaker terbuka):
+        # tetap sajikan pick yang sudah dianalisa
+        logger.warning(f"top_picks: daftar fixture gagal dimuat: {e!r}")
+        pending = []
+    skipped = []
+    async for f, pred in stream_predictions(pending, deadline, skipped):
+        analyze(f, pred)
+
+    if skipped:
+        metrics.incr("top.skipped", len(skipped))
+        logger.warning(f"top_picks: {len(skipped)} fixture dilewati (gagal / belum siap)")
+
+    try:
+        idx = await fixture_index()
+    except Exception:
+        idx = None
+
+    def keep(a):
+        f = a["fixture"]
+        if day and f["kickoff"][:10] != day:
+            return False
+        kickoff = idx.kickoff(f["fixture_id"]) if idx else None
+        return (kickoff or datetime.fromisoformat(f["kickoff"])) >= now
+
+    return RANKING.top(n, keep=keep)
+
+
+def render_top(picks, title=None):
+    lines = [title or f"🏆 *TOP {len(picks)} PICK*", "━━━━━━━━━━━━━━━━━━━━"]
+    for i, a in enumerate(picks, 1):
+        f = a["fixture"]
+        side = a["hdp_info"]["best_side"]
+        line = a["hdp"]["hdp_home" if side == "HOME" else "hdp_away"]
+        kickoff = datetime.fromisoformat(f["kickoff"])
+        lines.append(
+            f"{i}. *{f['home']} vs {f['away']}*\n"
+            f"🏆 {f['league_name']} | ⏰ {kickoff.strftime('%d %b %H:%M')}\n"
+            f"🎯 {side} {line} | HDP {a['hdp_info']['score']}% | "
+            f"Win {a['winner_conf']}% | {a['sync']['tag']}\n"
+        )
+    return "\n".join(lines)
+
+
+async def top(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if await throttled(update, "top", context.args):
+        return
+
+    first_id = None
+    try:
+        n = TOP_DEFAULT
+        if context.args and context.args[0].isdigit():
+            n = max(1, min(int(context.args[0]), TOP_MAX))
+
+        picks = await top_picks(n)
+        if not picks:
+            await update.message.reply_text("❌ Tidak ada pick yang layak.")
+            return
+
+        msg = await send_long_message(update, render_top(picks), parse_mode="Markdown")
+        first_id = msg.message_id if msg else None
+
+    except Exception:
+        logger.exception("Error saat top")
+        await update.message.reply_text(
+            "⚠️ Terjadi error saat memproses pick. Coba lagi nanti."
+        )
+
+    finally:
+        CHAT_THROTTLE.finish(update.effective_chat.id, "top", first_id)
+
+
+async def langganan(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if not BROADCAST_AT:
+        await update.message.reply_text("ℹ️ Kiriman harian belum diaktifkan.")
+        return
+
+    users = await load_users()
+    cid = str(update.effective_chat.id)
+    if cid not in users:
+        await update.message.reply_text("Ketik /start dulu 🙂")
+        return
+
+    on = not users[cid].get("broadcast")
+    users[cid]["broadcast"] = on
+    await save_users(users)
+    await update.message.reply_text(
+        f"📬 Pick harian akan dikirim tiap hari jam {BROADCAST_AT} WITA."
+        if on else "✅ Kiriman pick harian dihentikan."
+    )
+
+
+async def tuning_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    /tuning         → config aktif
+    /tuning reload  → baca ulang TUNING_FILE sekarang
+    """
+    if update.effective_user.id not in ADMIN_IDS:
+        return
+
+    if context.args[:1] == ["reload"]:
+        try:
+            await reload_tuning(force=True)
+        except ValueError as e:
+            await update.message.reply_text(f"❌ {e}\nConfig lama tetap dipakai.")
+            return
+
+    await send_long_message(update, tuning_summary(), parse_mode="Markdown")
+
+
+async def metrics_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if update.effective_user.id not in ADMIN_IDS:
+        return
+
+    metrics.gauge("fixtures.plan.date_items_est", round(FETCH_PLANNER.estimates["date"]))
+    metrics.gauge("fixtures.plan.league_items_est", round(FETCH_PLANNER.estimates["league"], 1))
+    await send_long_message(update, metrics.render(), parse_mode="Markdown")
+
 
 async def jadwal(update: Update, context: ContextTypes.DEFAULT_TYPE):
     try:
-        auto_cleanup_cache()
-        fixtures = get_fixtures()
+        idx = await fixture_index()
         now = datetime.now(WITA)
 
         lines = [
@@ -381,10 +2049,8 @@ async def jadwal(update: Update, context: ContextTypes.DEFAULT_TYPE):
         ]
 
         count = 0
-        for f in fixtures:
-            kickoff = datetime.fromisoformat(f["kickoff"])
-            if kickoff < now:
-                continue
+        for f in idx.upcoming(now):
+            kickoff = idx.kickoff(f["fixture_id"])
 
             lines.append(
                 f"⚽ *{f['home']} vs {f['away']}*\n"
@@ -413,18 +2079,65 @@ async def jadwal(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 # ================= REGISTER =================
 def register_handlers(app):
-    app.add_handler(CommandHandler("start", start))
-    app.add_handler(CommandHandler("jadwal", jadwal))
-    app.add_handler(CommandHandler("prediksi", prediksi))
-    app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, nickname_handler))
+    commands = {
+        "start": start,
+        "jadwal": jadwal,
+        "prediksi": prediksi,
+        "liga": liga,
+        "top": top,
+        "live": live_cmd,
+        "langganan": langganan,
+        "metrics": metrics_cmd,
+        "profile": profile_cmd,
+        "tuning": tuning_cmd,
+    }
+    # tiap update dapat correlation ID (trace_id) sendiri
+    for name, handler in commands.items():
+        app.add_handler(CommandHandler(name, traced(f"/{name}")(handler)))
+    app.add_handler(MessageHandler(
+        filters.TEXT & ~filters.COMMAND, traced("nickname")(nickname_handler)
+    ))
+
+
+BACKGROUND_TASKS = []
+
+
+async def start_background_tasks(app):
+    BACKGROUND_TASKS.append(asyncio.create_task(fixture_refresh_loop()))
+    BACKGROUND_TASKS.append(asyncio.create_task(cache_maintenance_loop()))
+    BACKGROUND_TASKS.append(asyncio.create_task(prediction_refresh_loop()))
+    BACKGROUND_TASKS.append(asyncio.create_task(tuning_watch_loop()))
+    BACKGROUND_TASKS.append(asyncio.create_task(analysis_prune_loop()))
+    if LIVE_MODE:
+        BACKGROUND_TASKS.append(asyncio.create_task(live_poll_loop(app)))
+    if BROADCAST_AT:
+        BACKGROUND_TASKS.append(asyncio.create_task(broadcast_loop(app)))
+    if HTTP_API_PORT:
+        BACKGROUND_TASKS.append(
+            asyncio.create_task(HTTP_API.serve(HTTP_API_HOST, HTTP_API_PORT))
+        )
+
+
+async def stop_background_tasks(app):
+    for t in BACKGROUND_TASKS:
+        t.cancel()
+    BACKGROUND_TASKS.clear()
 
 
 # ================= ENTRY POINT (WEBHOOK) =================
 def main():
     if not BOT_TOKEN:
         raise RuntimeError("BOT_TOKEN belum diset")
-
-    app = ApplicationBuilder().token(BOT_TOKEN).build()
+    if not API_KEY:
+        raise RuntimeError("API_KEY belum diset di environment")
+
+    app = (
+        ApplicationBuilder()
+        .token(BOT_TOKEN)
+        .post_init(start_background_tasks)
+        .post_shutdown(stop_background_tasks)
+        .build()
+    )
     register_handlers(app)
 
     logger.info("🤖 Bot running via polling (Railway safe mode)")
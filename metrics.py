@@ -0,0 +1,59 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# ================= STORE =================
+COUNTERS = defaultdict(int)
+TIMINGS = {}   # name -> [count, total, max]
+GAUGES = {}
+
+
+def incr(name: str, n: int = 1):
+    COUNTERS[name] += n
+
+
+def observe(name: str, value: float):
+    t = TIMINGS.setdefault(name, [0, 0.0, 0.0])
+    t[0] += 1
+    t[1] += value
+    t[2] = max(t[2], value)
+
+
+def gauge(name: str, value):
+    GAUGES[name] = value
+
+
+@contextmanager
+def timer(name: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - t0)
+
+
+# ================= EXPORT =================
+def snapshot() -> dict:
+    return {
+        "counters": dict(COUNTERS),
+        "timings": {
+            k: {"count": c, "avg": round(total / c, 4) if c else 0.0, "max": round(mx, 4)}
+            for k, (c, total, mx) in TIMINGS.items()
+        },
+        "gauges": dict(GAUGES),
+    }
+
+
+def render() -> str:
+    snap = snapshot()
+    lines = ["📊 *METRICS*", "```"]
+
+    for k, v in sorted(snap["counters"].items()):
+        lines.append(f"{k:<36}{v:>10}")
+    for k, v in sorted(snap["gauges"].items()):
+        lines.append(f"{k:<36}{v!s:>10}")
+    for k, v in sorted(snap["timings"].items()):
+        lines.append(f"{k:<36}{v['count']:>6} avg {v['avg']:.3f} max {v['max']:.3f}")
+
+    lines.append("```")
+    return "\n".join(lines)
@@ -0,0 +1,155 @@
+# =========================================================
+# ODDS PARSING & VALUE
+# =========================================================
+# Bookmaker yang dipakai bila tersedia (id api-sports), urut prioritas
+PREFERRED_BOOKMAKERS = (8, 11, 6)   # Bet365, 1xBet, Bwin
+
+
+def _odd(v):
+    try:
+        o = float(v)
+    except (TypeError, ValueError):
+        return None
+    return o if o > 1.0 else None
+
+
+def implied_probs(odds: dict) -> dict:
+    """
+    Odds desimal → probabilitas tersirat dengan margin bandar dibuang
+    (normalisasi proporsional 1/odd)
+    """
+    inv = {k: 1 / o for k, o in odds.items() if o}
+    total = sum(inv.values())
+    if total <= 0:
+        return {}
+    return {k: v / total for k, v in inv.items()}
+
+
+def _pick_bookmaker(bookmakers: list):
+    by_id = {b.get("id"): b for b in bookmakers}
+    for bid in PREFERRED_BOOKMAKERS:
+        if bid in by_id:
+            return by_id[bid]
+    return bookmakers[0] if bookmakers else None
+
+
+def parse_odds_item(item: dict):
+    """
+    Item /odds → record ringkas:
+    {"fixture_id", "bookmaker", "match_winner", "asian_handicap", "over_under"}
+    asian_handicap di-key garis HOME (away = -garis)
+    """
+    book = _pick_bookmaker(item.get("bookmakers") or [])
+    if not book:
+        return None
+
+    rec = {
+        "fixture_id": item["fixture"]["id"],
+        "bookmaker": book.get("name"),
+        "match_winner": {},
+        "asian_handicap": {},
+        "over_under": {},
+    }
+
+    for bet in book.get("bets", []):
+        name = bet.get("name")
+        for v in bet.get("values", []):
+            odd = _odd(v.get("odd"))
+            if odd is None:
+                continue
+            label = str(v.get("value", ""))
+
+            if name == "Match Winner":
+                key = {"Home": "home", "Draw": "draw", "Away": "away"}.get(label)
+                if key:
+                    rec["match_winner"][key] = odd
+
+            elif name == "Asian Handicap":
+                # "Home -0.5" / "Away +0.5": handicap milik sisi tsb
+                try:
+                    side, line = label.split()
+                    line = float(line)
+                except ValueError:
+                    continue
+                if side == "Home":
+                    rec["asian_handicap"].setdefault(str(line), {})["home"] = odd
+                elif side == "Away":
+                    rec["asian_handicap"].setdefault(str(-line), {})["away"] = odd
+
+            elif name == "Goals Over/Under":
+                try:
+                    side, line = label.split()
+                    line = float(line)
+                except ValueError:
+                    continue
+                key = side.lower()
+                if key in ("over", "under"):
+                    rec["over_under"].setdefault(str(line), {})[key] = odd
+
+    return rec
+
+
+# =========================================================
+# EDGE VS ENGINE
+# =========================================================
+def _edge(model_p: float, implied_p: float, odd: float) -> dict:
+    return {
+        "model": round(model_p, 3),
+        "implied": round(implied_p, 3),
+        "edge": round(model_p - implied_p, 3),
+        "odd": odd,
+    }
+
+
+def value_edges(rec: dict, hdp: dict, pick_side: str = None, winner_conf: int = None) -> dict:
+    """
+    Bandingkan probabilitas engine dengan harga bandar (margin dibuang).
+    - 1X2       : home/draw/away_prob dari hdp_engine
+    - HDP       : cover_curve hdp_engine pada garis yang ditawarkan bandar
+    - O/U       : markets.over_under hdp_engine
+    - pick      : confidence final_decision (pick_side "home"/"away")
+                  vs peluang menang tersirat
+    best_hdp = edge HDP terbesar pada sisi terbaik hdp_engine
+    """
+    out = {"bookmaker": rec.get("bookmaker"), "match_winner": {}, "asian_handicap": [], "over_under": []}
+
+    mw = rec.get("match_winner", {})
+    imp = implied_probs(mw) if len(mw) == 3 else {}
+    for k in imp:
+        out["match_winner"][k] = _edge(hdp.get(f"{k}_prob", 0.0), imp[k], mw[k])
+
+    curve = {p["line"]: p for p in hdp.get("cover_curve") or []}
+    for line, prices in rec.get("asian_handicap", {}).items():
+        # key = garis HOME; harga away di key L berlaku untuk away -L
+        home_line = float(line)
+        home_pt, away_pt = curve.get(home_line), curve.get(-home_line)
+        if not home_pt or not away_pt or len(prices) != 2:
+            continue
+        model = {"home": home_pt["home"], "away": away_pt["away"]}
+        imp = implied_probs(prices)
+        for side in ("home", "away"):
+            e = _edge(model[side], imp[side], prices[side])
+            e.update(side=side.upper(), line=home_line if side == "home" else -home_line)
+            out["asian_handicap"].append(e)
+
+    ou_model = (hdp.get("markets") or {}).get("over_under", {})
+    for line, prices in rec.get("over_under", {}).items():
+        model = ou_model.get(line)
+        if not model or len(prices) != 2:
+            continue
+        imp = implied_probs(prices)
+        for side in ("over", "under"):
+            e = _edge(model[side], imp[side], prices[side])
+            e.update(side=side.upper(), line=float(line))
+            out["over_under"].append(e)
+
+    best_side = hdp.get("best_hdp_side")
+    ah = [e for e in out["asian_handicap"] if e["side"] == best_side]
+    out["best_hdp"] = max(ah, key=lambda e: e["edge"]) if ah else None
+
+    # pick engine.final_decision (hanya pick tim, bukan draw / double chance)
+    if pick_side in out["match_winner"] and winner_conf is not None:
+        mw_side = out["match_winner"][pick_side]
+        out["pick"] = _edge(winner_conf / 100, mw_side["implied"], mw_side["odd"])
+
+    return out
@@ -0,0 +1,96 @@
+import json
+import zlib
+
+# =========================================================
+# SCHEMA
+# =========================================================
+# Hanya field /predictions yang dibaca engine.py, hdp_engine.py & formatter.
+# Urutan = posisi kolom dalam record; tambah/ubah field → naikkan versi.
+SCHEMA_VERSION = 2
+MAGIC = b"PRD"
+
+_TEAM_FIELDS = (
+    "id",
+    "name",
+    "last_5.form",
+    "last_5.att",
+    "last_5.def",
+    "last_5.goals.for.average",
+    "last_5.goals.against.average",
+    "league.form",
+    "league.goals.for.average.home",
+    "league.goals.for.average.away",
+    "league.goals.against.average.home",
+    "league.goals.against.average.away",
+)
+
+_COMPARISON_KEYS = ("h2h", "goals", "att", "def", "total")
+
+FIELDS = (
+    ("league.id", "league.season")
+    + tuple(f"teams.{side}.{f}" for side in ("home", "away") for f in _TEAM_FIELDS)
+    + tuple(f"predictions.percent.{k}" for k in ("home", "draw", "away"))
+    + tuple(
+        f"comparison.{c}.{side}"
+        for c in _COMPARISON_KEYS for side in ("home", "away")
+    )
+)
+
+
+def _get(obj, path: str):
+    for key in path.split("."):
+        if not isinstance(obj, dict):
+            return None
+        obj = obj.get(key)
+    return obj
+
+
+# =========================================================
+# PROJECTION
+# =========================================================
+def project(pred_resp: dict) -> list:
+    """
+    Response /predictions penuh → record positional sesuai FIELDS.
+    Nilai disimpan apa adanya (str "45%", angka, None) supaya parsing
+    di engine tetap sama.
+    """
+    return [_get(pred_resp, path) for path in FIELDS]
+
+
+def expand(record: list) -> dict:
+    """
+    Record → dict bersarang dengan bentuk yang sama seperti response asli
+    (field kosong tidak dibuat, jadi .get() default di engine tetap jalan)
+    """
+    out = {}
+    for path, value in zip(FIELDS, record):
+        if value is None:
+            continue
+        node = out
+        *parents, leaf = path.split(".")
+        for key in parents:
+            node = node.setdefault(key, {})
+        node[leaf] = value
+    return out
+
+
+# =========================================================
+# ENCODING
+# =========================================================
+def dumps(expires_at: str, stale_until: str, record: list) -> bytes:
+    body = json.dumps([expires_at, stale_until, record], separators=(",", ":"))
+    return MAGIC + bytes([SCHEMA_VERSION]) + zlib.compress(body.encode())
+
+
+def loads(blob: bytes):
+    """
+    → (expires_at, stale_until, record).
+    ValueError jika format / versi tidak cocok.
+    """
+    if blob[:3] != MAGIC or blob[3:4] != bytes([SCHEMA_VERSION]):
+        raise ValueError("prediction cache: schema tidak cocok")
+
+    expires_at, stale_until, record = json.loads(zlib.decompress(blob[4:]))
+    if len(record) != len(FIELDS):
+        raise ValueError("prediction cache: jumlah kolom tidak cocok")
+    return expires_at, stale_until, record
@@ -0,0 +1,97 @@
+import io
+import os
+import sys
+import time
+import pstats
+import cProfile
+import threading
+from collections import Counter
+
+TOP_DEFAULT = 15
+SAMPLE_INTERVAL = 0.005
+
+
+def _where(code) -> str:
+    return f"{os.path.basename(code.co_filename)}:{code.co_firstlineno}({code.co_name})"
+
+
+def _table(rows, header) -> str:
+    lines = ["```", header]
+    lines.extend(rows)
+    lines.append("```")
+    return "\n".join(lines)
+
+
+# =========================================================
+# DETERMINISTIC (cProfile)
+# =========================================================
+def profile_call(fn, path: str, *args, top: int = TOP_DEFAULT):
+    """
+    Jalankan fn(*args) di bawah cProfile (thread pemanggil saja).
+    File .prof penuh disimpan ke `path` (buka dengan pstats / snakeviz).
+    → (hasil fn, ringkasan top fungsi berdasarkan waktu kumulatif)
+    """
+    prof = cProfile.Profile()
+    t0 = time.perf_counter()
+    result = prof.runcall(fn, *args)
+    wall = time.perf_counter() - t0
+    prof.dump_stats(path)
+
+    stats = pstats.Stats(prof, stream=io.StringIO())
+    rows = sorted(stats.stats.items(), key=lambda kv: kv[1][3], reverse=True)
+
+    out = []
+    for (filename, lineno, func), (_, ncalls, tottime, cumtime, _) in rows[:top]:
+        where = f"{os.path.basename(filename)}:{lineno}({func})"
+        out.append(f"{cumtime:8.3f} {tottime:8.3f} {ncalls:>7} {where[:48]}")
+
+    text = f"wall {wall:.2f}s\n" + _table(out, f"{'cum_s':>8} {'self_s':>8} {'calls':>7} fungsi")
+    return result, text
+
+
+# =========================================================
+# SAMPLING (seluruh proses)
+# =========================================================
+def sample(seconds: float, path: str, interval: float = SAMPLE_INTERVAL, top: int = TOP_DEFAULT) -> str:
+    """
+    Ambil stack semua thread tiap `interval` detik selama `seconds` detik
+    lewat sys._current_frames(), tanpa memperlambat kode yang diamati.
+    Stack disimpan ke `path` dalam format folded (flamegraph.pl / speedscope).
+    """
+    me = threading.get_ident()
+    cumulative = Counter()
+    own = Counter()
+    stacks = Counter()
+    samples = 0
+
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for tid, frame in sys._current_frames().items():
+            if tid == me:
+                continue
+            chain = []
+            while frame is not None:
+                chain.append(_where(frame.f_code))
+                frame = frame.f_back
+            if not chain:
+                continue
+
+            own[chain[0]] += 1
+            for where in set(chain):
+                cumulative[where] += 1
+            stacks[";".join(reversed(chain))] += 1
+            samples += 1
+        time.sleep(interval)
+
+    with open(path, "w") as f:
+        for stack, n in stacks.most_common():
+            f.write(f"{stack} {n}\n")
+
+    if not samples:
+        return "Tidak ada sample."
+
+    rows = [
+        f"{n / samples * 100:6.1f}% {own[where] / samples * 100:6.1f}% {where[:48]}"
+        for where, n in cumulative.most_common(top)
+    ]
+    return f"{samples} sample stack\n" + _table(rows, f"{'cum':>7} {'self':>7} fungsi")
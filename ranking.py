@@ -0,0 +1,76 @@
+import bisect
+import threading
+
+# urutan tag sync_confidence (semakin besar semakin layak)
+SYNC_RANK = {
+    "🔥 IDEAL HDP": 3,
+    "💎 VALUE HDP": 2,
+    "⚠️ WIN ONLY": 1,
+}
+
+
+class RankedIndex:
+    """
+    Index pick terurut (terbaik di depan).
+    Di-update per fixture saat prediksi dihitung, jadi /top cukup
+    membaca N entry teratas tanpa sort ulang seluruh slate.
+    Aman dipanggil dari thread refresh (discard saat prediksi di-fetch ulang).
+    """
+
+    def __init__(self):
+        self._keys = []      # sort key, ascending = terbaik dulu
+        self._by_fid = {}    # fixture_id -> sort key
+        self._items = {}     # fixture_id -> item
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def update(self, fid, item, hdp_score: int, winner_conf: int, sync: dict):
+        with self._lock:
+            self._discard(fid)
+
+            if sync.get("decision") == "NO BET":
+                return
+
+            key = (
+                -hdp_score,
+                -winner_conf,
+                -SYNC_RANK.get(sync.get("tag"), 0),
+                fid,
+            )
+            bisect.insort(self._keys, key)
+            self._by_fid[fid] = key
+            self._items[fid] = item
+
+    def clear(self):
+        with self._lock:
+            self._keys.clear()
+            self._by_fid.clear()
+            self._items.clear()
+
+    def discard(self, fid):
+        with self._lock:
+            self._discard(fid)
+
+    def _discard(self, fid):
+        key = self._by_fid.pop(fid, None)
+        if key is None:
+            return
+
+        i = bisect.bisect_left(self._keys, key)
+        del self._keys[i]
+        self._items.pop(fid, None)
+
+    def top(self, n: int, keep=None) -> list:
+        with self._lock:
+            entries = [self._items[key[-1]] for key in self._keys]
+
+        out = []
+        for item in entries:
+            if keep and not keep(item):
+                continue
+            out.append(item)
+            if len(out) >= n:
+                break
+        return out
@@ -0,0 +1,79 @@
+import time
+import asyncio
+
+
+class RateLimiter:
+    """
+    Membagi request secara merata: maksimal `per_minute` acquire per menit,
+    dengan jarak tetap antar acquire (bukan burst di awal menit).
+    """
+
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            if wait > 0:
+                await asyncio.sleep(wait)
+                now = self._next
+            self._next = now + self.interval
+
+
+class ChatThrottle:
+    """
+    Satu perintah berat per chat: perintah yang masih berjalan, atau diulang
+    dengan argumen yang sama dalam `window` detik, ditahan; entry sebelumnya
+    (beserta message_id jawabannya) dikembalikan supaya handler bisa
+    merujuknya. Argumen lain (halaman / filter berbeda) boleh jalan.
+    """
+
+    MAX_ENTRIES = 1000
+
+    def __init__(self, window: float):
+        self.window = window
+        self._last = {}     # (chat_id, command) -> entry
+
+    def begin(self, chat_id, command: str, args=(), now: float = None):
+        """
+        None → boleh jalan (dicatat sebagai sedang berjalan),
+        selain itu entry sebelumnya yang menahan perintah ini
+        """
+        now = time.monotonic() if now is None else now
+        key = (chat_id, command)
+        args = tuple(args)
+
+        prev = self._last.get(key)
+        if prev and (
+            prev["running"]
+            or (prev["args"] == args and now - prev["at"] < self.window)
+        ):
+            return prev
+
+        if len(self._last) >= self.MAX_ENTRIES:
+            self._prune(now)
+        self._last[key] = {
+            "at": now,
+            "args": args,
+            "message_id": None,
+            "running": True,
+        }
+        return None
+
+    def finish(self, chat_id, command: str, message_id=None):
+        entry = self._last.get((chat_id, command))
+        if entry:
+            entry["running"] = False
+            entry["message_id"] = message_id
+
+    def retry_in(self, entry, now: float = None) -> int:
+        now = time.monotonic() if now is None else now
+        return max(1, int(entry["at"] + self.window - now + 0.999))
+
+    def _prune(self, now):
+        for key, e in list(self._last.items()):
+            if not e["running"] and now - e["at"] >= self.window:
+                del self._last[key]
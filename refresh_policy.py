@@ -0,0 +1,44 @@
+import random
+from datetime import timedelta
+
+# =========================================================
+# PREDICTION TTL POLICY
+# =========================================================
+# "jam_sebelum_kickoff:ttl_menit,..." — semakin dekat kickoff semakin
+# pendek TTL. Contoh default: >=48 jam → 12 jam, ..., <2 jam → 20 menit
+DEFAULT_POLICY = "48:720,24:360,6:120,2:45,0:20"
+
+
+def parse_policy(spec: str) -> list:
+    rules = []
+    for part in spec.split(","):
+        hours, minutes = part.split(":")
+        rules.append((float(hours), float(minutes)))
+
+    rules.sort(reverse=True)
+    if not rules:
+        raise ValueError("PREDICTION_TTL_POLICY kosong")
+    return rules
+
+
+def ttl_for(hours_to_kickoff: float, rules: list) -> timedelta:
+    for threshold, minutes in rules:
+        if hours_to_kickoff >= threshold:
+            return timedelta(minutes=minutes)
+    return timedelta(minutes=rules[-1][1])
+
+
+def plan_refresh(now, kickoff, rules: list, jitter: float = 0.1):
+    """
+    → (expires_at, refresh_at). refresh_at None jika tidak perlu refresh
+    lagi sebelum kickoff. refresh_at sedikit sebelum expires_at (acak s/d
+    `jitter` x TTL) supaya refresh tidak menumpuk di detik yang sama.
+    """
+    ttl = ttl_for((kickoff - now).total_seconds() / 3600, rules)
+    expires_at = min(now + ttl, kickoff)
+
+    if expires_at >= kickoff:
+        return expires_at, None
+
+    refresh_at = expires_at - ttl * random.uniform(0, jitter)
+    return expires_at, refresh_at
@@ -0,0 +1,83 @@
+"""
+Server pengganti api-sports untuk uji lokal (tanpa kuota).
+
+    python stub_api.py ./stub_data 8099
+    API_URL=http://127.0.0.1:8099 ODDS_ENABLED=1 python main.py
+
+Tiap endpoint dibaca dari <data_dir>/<endpoint>.json, isinya list item
+"response" (mis. odds.json, predictions.json, fixtures.json). Response
+dipecah per halaman (?page=N) seperti api-sports asli.
+"""
+import os
+import sys
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+PAGE_SIZE = int(os.getenv("STUB_PAGE_SIZE", "10"))
+
+# param query → path field item untuk filter sederhana
+FILTERS = {
+    "fixture": "fixture.id",
+    "league": "league.id",
+    "team": "team.id",
+}
+
+
+def _get(obj, path: str):
+    for key in path.split("."):
+        if not isinstance(obj, dict):
+            return None
+        obj = obj.get(key)
+    return obj
+
+
+def make_handler(data_dir: str):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            endpoint = url.path.strip("/").replace("/", "_")
+
+            try:
+                with open(os.path.join(data_dir, f"{endpoint}.json")) as f:
+                    items = json.load(f)
+            except FileNotFoundError:
+                items = []
+
+            for param, path in FILTERS.items():
+                if param in params:
+                    items = [i for i in items if str(_get(i, path)) == params[param]]
+
+            page = int(params.get("page", 1))
+            total = max(1, -(-len(items) // PAGE_SIZE))
+            body = {
+                "get": endpoint,
+                "parameters": params,
+                "errors": [],
+                "results": len(items),
+                "paging": {"current": page, "total": total},
+                "response": items[(page - 1) * PAGE_SIZE:page * PAGE_SIZE],
+            }
+
+            data = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+def main():
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else "stub_data"
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 8099
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(data_dir))
+    print(f"stub api-sports: http://127.0.0.1:{port} (data: {data_dir})")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
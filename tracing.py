@@ -0,0 +1,143 @@
+import os
+import json
+import time
+import uuid
+import queue
+import atexit
+import logging
+import logging.handlers
+import threading
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+# =========================================================
+# CONFIG
+# =========================================================
+# TRACE_OUTPUT: "log" = baris JSON lewat logger TRACE, "off" = mati,
+# selain itu = path file trace (JSON per baris)
+TRACE_OUTPUT = os.getenv("TRACE_OUTPUT", "log")
+
+_TRACE_ID = ContextVar("trace_id", default=None)
+_SPAN_ID = ContextVar("span_id", default=None)
+
+_logger = logging.getLogger("TRACE")
+_file_logger = None
+_file_lock = threading.Lock()
+
+
+def current_trace_id():
+    return _TRACE_ID.get()
+
+
+def _new_id(n: int = 8) -> str:
+    return uuid.uuid4().hex[:n]
+
+
+def _trace_file_logger():
+    """
+    Logger ke file TRACE_OUTPUT: span hanya masuk antrian (QueueHandler),
+    satu thread QueueListener yang menulis ke disk, jadi event loop tidak
+    pernah menunggu I/O file
+    """
+    global _file_logger
+    with _file_lock:
+        if _file_logger is None:
+            q = queue.SimpleQueue()
+            handler = logging.FileHandler(TRACE_OUTPUT, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            listener = logging.handlers.QueueListener(q, handler)
+            listener.start()
+            atexit.register(listener.stop)
+
+            logger = logging.getLogger("TRACE.file")
+            logger.addHandler(logging.handlers.QueueHandler(q))
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            _file_logger = logger
+        return _file_logger
+
+
+def _emit(record: dict):
+    line = json.dumps(record, ensure_ascii=False, default=str)
+    if TRACE_OUTPUT == "log":
+        _logger.info(line)
+        return
+    (_file_logger or _trace_file_logger()).info(line)
+
+
+# =========================================================
+# SPANS
+# =========================================================
+@contextmanager
+def span(name: str, **attrs):
+    """
+    Ukur satu langkah dalam trace aktif. attrs (dict yang di-yield) boleh
+    ditambah di dalam blok, mis. attrs["cache"] = "hit".
+    Di luar trace (task background, process worker) tidak mencatat apa pun.
+    ContextVar ikut ter-copy ke asyncio task & asyncio.to_thread.
+    """
+    trace_id = _TRACE_ID.get()
+    if trace_id is None or TRACE_OUTPUT == "off":
+        yield attrs
+        return
+
+    span_id = _new_id()
+    parent_id = _SPAN_ID.get()
+    token = _SPAN_ID.set(span_id)
+    started = datetime.now(timezone.utc)
+    t0 = time.perf_counter()
+    status = "ok"
+    try:
+        yield attrs
+    except BaseException as e:
+        status = type(e).__name__
+        raise
+    finally:
+        _SPAN_ID.reset(token)
+        _emit({
+            "ts": started.isoformat(),
+            "trace_id": trace_id,
+            "span_id": span_id,
+            "parent_id": parent_id,
+            "name": name,
+            "duration_ms": round((time.perf_counter() - t0) * 1000, 2),
+            "status": status,
+            **({"attrs": attrs} if attrs else {}),
+        })
+
+
+def traced(name: str):
+    """
+    Decorator handler Telegram: tiap update dapat correlation ID baru
+    dan span root `name` yang membungkus seluruh handler
+    """
+    def wrap(handler):
+        @functools.wraps(handler)
+        async def inner(update, context):
+            token = _TRACE_ID.set(_new_id(12))
+            try:
+                chat = getattr(update, "effective_chat", None)
+                with span(name, chat_id=chat.id if chat else None):
+                    return await handler(update, context)
+            finally:
+                _TRACE_ID.reset(token)
+        return inner
+    return wrap
+
+
+# =========================================================
+# LOGGING
+# =========================================================
+class TraceIdFilter(logging.Filter):
+    """Tambahkan %(trace_id)s ke setiap log record"""
+
+    def filter(self, record):
+        record.trace_id = _TRACE_ID.get() or "-"
+        return True
+
+
+def install_log_filter():
+    for handler in logging.getLogger().handlers:
+        handler.addFilter(TraceIdFilter())
@@ -0,0 +1,147 @@
+import copy
+import json
+import inspect
+import threading
+
+# =========================================================
+# DEFAULT CONFIG
+# =========================================================
+# Pipeline faktor engine.py + angka tuning engine & hdp_engine.
+# File tuning (JSON) cukup berisi bagian yang diubah; sisanya dari sini.
+# "factors" selalu diganti utuh (urutan = urutan faktor).
+DEFAULT_CONFIG = {
+    "factors": [
+        {"name": "percent", "extractor": "percent", "weight": 0.09},
+        {"name": "last5_form", "extractor": "last5_form", "weight": 0.14},
+        {"name": "attack", "extractor": "relative_attack", "weight": 0.12},
+        {"name": "defense", "extractor": "relative_defense", "weight": 0.12},
+        {"name": "goals_for", "extractor": "goals_for", "weight": 0.12,
+         "params": {"scale": 20}},           # 2.5 gol ≈ 50
+        {"name": "goals_against", "extractor": "goals_against", "weight": 0.12,
+         "params": {"scale": 20}},
+        {"name": "league_form", "extractor": "league_form", "weight": 0.07},
+        {"name": "h2h", "extractor": "h2h", "weight": 0.05},
+    ],
+    # 🔧 home bias normalization, dikurangkan dari skor home (1.5–2.2)
+    "home_bias": 1.8,
+    # edge minimal (5 poin persen) vs harga bandar untuk disebut value
+    "value_edge_min": 0.05,
+    "hdp": {
+        "target_cover": 0.55,    # minimal risk-adjusted cover agar garis layak
+        "risk_aversion": 0.10,   # penalti per simpangan baku hasil taruhan
+        "xg_min": 0.6,           # xG stability guard
+        "xg_max": 3.0,
+        "adjust": {"goals": 0.20, "att": 0.15, "def": 0.10},
+    },
+}
+
+# faktor yang dibaca formatter & catatan insight, tidak boleh dihapus
+# (bobot 0 boleh)
+REQUIRED_FACTORS = ("attack", "defense", "last5_form", "goals_for", "league_form", "h2h")
+
+_STATE = {"config": DEFAULT_CONFIG, "version": 0}
+_LOCK = threading.Lock()
+
+
+def current() -> dict:
+    """
+    Config aktif. Ambil sekali per perhitungan lalu teruskan, supaya satu
+    analisa tidak mencampur config lama & baru saat reload.
+    """
+    return _STATE["config"]
+
+
+def version() -> int:
+    return _STATE["version"]
+
+
+# =========================================================
+# LOAD & VALIDATE
+# =========================================================
+def _merge(base: dict, override: dict) -> dict:
+    out = copy.deepcopy(base)
+    for k, v in override.items():
+        if isinstance(v, dict) and isinstance(out.get(k), dict):
+            out[k] = _merge(out[k], v)
+        else:
+            out[k] = v
+    return out
+
+
+def _number(value, path: str, lo=None, hi=None) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"tuning: {path} harus angka")
+    if (lo is not None and value < lo) or (hi is not None and value > hi):
+        raise ValueError(f"tuning: {path} di luar batas [{lo}, {hi}]")
+    return value
+
+
+def validate(cfg: dict, extractors) -> dict:
+    """
+    ValueError jika config tidak bisa dipakai engine
+    """
+    names = set()
+    for i, f in enumerate(cfg.get("factors") or []):
+        if not isinstance(f, dict) or not f.get("name"):
+            raise ValueError(f"tuning: factors[{i}] tanpa name")
+        if f.get("extractor") not in extractors:
+            raise ValueError(f"tuning: extractor tidak dikenal: {f.get('extractor')!r}")
+        params = f.get("params", {})
+        if not isinstance(params, dict):
+            raise ValueError(f"tuning: factors[{i}].params harus object")
+        try:
+            inspect.signature(extractors[f["extractor"]]).bind(None, **params)
+        except TypeError:
+            raise ValueError(f"tuning: params {f['name']!r} tidak cocok") from None
+        # semua params extractor berupa angka (skala, ambang, ...)
+        for k, v in params.items():
+            _number(v, f"factors[{i}].params.{k}")
+        _number(f.get("weight"), f"factors[{i}].weight", 0)
+        if f["name"] in names:
+            raise ValueError(f"tuning: faktor ganda {f['name']!r}")
+        names.add(f["name"])
+
+    missing = [n for n in REQUIRED_FACTORS if n not in names]
+    if missing:
+        raise ValueError(f"tuning: faktor wajib hilang: {', '.join(missing)}")
+
+    _number(cfg["home_bias"], "home_bias")
+    _number(cfg["value_edge_min"], "value_edge_min", 0, 1)
+
+    hdp = cfg["hdp"]
+    _number(hdp["target_cover"], "hdp.target_cover", 0, 1)
+    _number(hdp["risk_aversion"], "hdp.risk_aversion", 0)
+    _number(hdp["xg_min"], "hdp.xg_min", 0)
+    _number(hdp["xg_max"], "hdp.xg_max", hdp["xg_min"])
+    for k in ("goals", "att", "def"):
+        _number(hdp["adjust"].get(k), f"hdp.adjust.{k}", 0, 1)
+    return cfg
+
+
+def load_file(path: str, extractors) -> dict:
+    """
+    File JSON → config lengkap tervalidasi (belum diaktifkan).
+    File tidak ada → DEFAULT_CONFIG.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            override = json.load(f)
+    except FileNotFoundError:
+        override = {}
+
+    if not isinstance(override, dict):
+        raise ValueError("tuning: isi file harus object JSON")
+    try:
+        return validate(_merge(DEFAULT_CONFIG, override), extractors)
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"tuning: struktur tidak valid ({e!r})") from e
+
+
+def apply(cfg: dict) -> int:
+    """
+    Aktifkan config (satu assignment, atomik bagi pembaca) → versi baru
+    """
+    with _LOCK:
+        _STATE["config"] = cfg
+        _STATE["version"] += 1
+        return _STATE["version"]